@@ -0,0 +1,99 @@
+"""
+Debate orchestration shared by the Chainlit front-end (frontend.py) and the
+headless batch engine (debate_engine.py).
+
+One debate round: the user message is added to the transcript, every persona
+answers in turn (personas after the first get the user message repeated as a
+nudge), then the stateless fact-checker analyses the responses of the round.
+"""
+
+# avatar files names are the same as the persona name in lowercase:
+# - public/avatars/republican.png
+# - public/avatars/democrat.png
+PERSONA_MODELS = {
+    "Democrat": "dem-model:latest",
+    "Republican": "rep-model:latest",
+}
+
+FACT_CHECKER_MODEL = "fact-checker:latest"
+
+FACT_CHECK_SEPARATORS = ["FACT CHECKER RESPONSE", "Fact Checker Response"]
+
+
+def agents_for(persona_choice: str) -> list:
+    """Agents answering for a persona choice ("Democrat", "Republican" or "Both")."""
+    agents = []
+    if persona_choice in ["Democrat", "Both"]:
+        agents.append({"name": "Democrat", "model": PERSONA_MODELS["Democrat"]})
+    if persona_choice in ["Republican", "Both"]:
+        agents.append({"name": "Republican", "model": PERSONA_MODELS["Republican"]})
+    return agents
+
+
+async def run_persona_turn(client, agent: dict, transcript: list, user_content: str, nudge: bool,
+                           on_token=None, keep_alive=0, options: dict = None) -> str:
+    """
+    Stream one persona's answer and return the full response.
+
+    Args:
+        client: ollama.AsyncClient (or anything with the same chat interface)
+        agent: {"name": ..., "model": ...}
+        transcript: Conversation so far, including the current user message
+        user_content: The current user message
+        nudge: Repeat the user message at the end of the context (for every persona but the first)
+        on_token: Optional coroutine function called with every streamed token
+        keep_alive: Passed to Ollama, 0 unloads the model right after the answer
+        options: Optional Ollama options (e.g. a seed)
+    """
+    current_context = list(transcript)
+    if nudge:
+        current_context.append({
+            "role": "user",
+            "content": user_content,
+        })
+
+    full_response = ""
+    stream = await client.chat(
+        model=agent["model"],
+        messages=current_context,
+        stream=True,
+        keep_alive=keep_alive,
+        options=options
+    )
+
+    async for chunk in stream:
+        token = chunk.get('message', {}).get('content', '')
+        if token:
+            full_response += token
+            if on_token:
+                await on_token(token)
+
+    return full_response
+
+
+def fact_check_prompt(responses: list) -> str:
+    # Create a condensed prompt of only what was just said
+    return (f"Analyze the following debate statement or statements for factual accuracy and logical "
+            f"fallacies. Be objective and brief:\n\n{responses}")
+
+
+def parse_fact_check(fact_check_content: str):
+    """Extract the fact checker response section, None if the model did not produce one."""
+    for separator in FACT_CHECK_SEPARATORS:
+        if separator in fact_check_content:
+            fact_check_response = fact_check_content.split(separator, 1)[1][3:]  # [3:] ignores ** at the beginning
+            return fact_check_response.replace('"', '')  # strip " from beginning and end of content
+    return None
+
+
+async def run_fact_check(client, responses: list, keep_alive=0, options: dict = None) -> str:
+    """Return the raw fact checker output for the responses of one round."""
+    # The fact checker gets NO conversation history (stateless)
+    response = await client.chat(
+        model=FACT_CHECKER_MODEL,
+        messages=[{"role": "user", "content": fact_check_prompt(responses)}],
+        stream=False,
+        keep_alive=keep_alive,
+        options=options
+    )
+    return response['message']['content']
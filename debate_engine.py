@@ -0,0 +1,268 @@
+"""
+Headless batch debate engine.
+
+Runs many automated multi-round Democrat vs Republican debates with fact-check
+annotations, using the same orchestration as the Chainlit front-end (debate.py).
+Debates are seeded from persona_construction/evaluation_prompts.json: the first
+round uses the evaluation prompt, every following round asks the personas to
+respond to each other.
+
+Throughput:
+    - debates run concurrently on a fixed pool of workers
+    - requests are limited per model, so no model gets more parallel requests
+      than Ollama serves at once (OLLAMA_NUM_PARALLEL)
+    - models stay loaded between requests (the front-end unloads them after every answer)
+
+Every round is appended to the output JSONL as soon as it is finished and the
+debate state is checkpointed to disk, so an interrupted run resumes where it stopped.
+
+Usage:
+    python debate_engine.py --rounds 3 --repeats 20 --concurrency 8 --output debates.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from debate import agents_for, parse_fact_check, run_fact_check, run_persona_turn
+from ollama_router import get_router
+
+PROMPTS_PATH = Path(__file__).resolve().parent / "persona_construction" / "evaluation_prompts.json"
+
+# user message for every round after the first
+REBUTTAL_PROMPT = "Respond directly to your opponent's last statement and defend your position."
+
+
+class ThrottledClient:
+    """Wraps an ollama.AsyncClient and limits the number of in-flight requests per model."""
+
+    def __init__(self, client, max_inflight_per_model: int = 1):
+        self.client = client
+        self.max_inflight_per_model = max_inflight_per_model
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _slot(self, model: str) -> asyncio.Semaphore:
+        if model not in self._slots:
+            self._slots[model] = asyncio.Semaphore(self.max_inflight_per_model)
+        return self._slots[model]
+
+    async def chat(self, model: str, stream: bool = False, **kwargs):
+        slot = self._slot(model)
+        if not stream:
+            async with slot:
+                return await self.client.chat(model=model, stream=False, **kwargs)
+        return self._stream(slot, model, kwargs)
+
+    async def _stream(self, slot: asyncio.Semaphore, model: str, kwargs: dict):
+        # the slot is held until the whole answer has been streamed
+        async with slot:
+            async for chunk in await self.client.chat(model=model, stream=True, **kwargs):
+                yield chunk
+
+
+def load_debates(prompts_path: str, repeats: int) -> List[Dict]:
+    """One debate per evaluation prompt and repeat."""
+    with open(prompts_path, 'r', encoding='utf-8') as f:
+        prompts = json.load(f)
+
+    return [
+        {
+            'debate_id': f"{item['id']}-{repeat}",
+            'prompt_id': item['id'],
+            'category': item.get('category'),
+            'prompt': item['prompt'],
+            # a fixed seed per debate makes every debate reproducible
+            'seed': repeat,
+        }
+        for repeat in range(repeats)
+        for item in prompts
+    ]
+
+
+class DebateEngine:
+    """Runs debates concurrently, checkpoints every round and streams rounds as JSONL."""
+
+    def __init__(self, client, output_path: str, checkpoint_dir: str, rounds: int = 3,
+                 concurrency: int = 8, keep_alive: str = "10m"):
+        """
+        Initialize the engine.
+
+        Args:
+            client: Client with the ollama.AsyncClient chat interface
+            output_path: JSONL file the finished rounds are appended to
+            checkpoint_dir: Folder with one checkpoint file per debate
+            rounds: Number of rounds per debate
+            concurrency: Number of debates running at the same time
+            keep_alive: How long Ollama keeps the models loaded between requests
+        """
+        self.client = client
+        self.output_path = Path(output_path)
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.rounds = rounds
+        self.concurrency = concurrency
+        self.keep_alive = keep_alive
+        self.agents = agents_for("Both")
+        self._emitted = set()
+        self.completed = 0
+        self.failed = 0
+
+    # ---- checkpoints ----
+
+    def _checkpoint_path(self, debate_id: str) -> Path:
+        return self.checkpoint_dir / f"{debate_id}.json"
+
+    def load_checkpoint(self, debate: Dict) -> Dict:
+        path = self._checkpoint_path(debate['debate_id'])
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'debate': debate, 'transcript': [], 'rounds': []}
+
+    def save_checkpoint(self, state: Dict):
+        path = self._checkpoint_path(state['debate']['debate_id'])
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        # replace in one step so a crash never leaves a half-written checkpoint
+        os.replace(tmp_path, path)
+
+    # ---- output ----
+
+    def _load_emitted(self):
+        # rounds already in the output (a crash between output and checkpoint must not duplicate them)
+        if self.output_path.exists():
+            with open(self.output_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._emitted.add((record['debate_id'], record['round']))
+
+    def emit(self, record: Dict):
+        key = (record['debate_id'], record['round'])
+        if key in self._emitted:
+            return
+        self._emitted.add(key)
+        self._output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._output.flush()
+
+    # ---- debates ----
+
+    async def run_round(self, state: Dict) -> Dict:
+        debate = state['debate']
+        transcript = state['transcript']
+        round_number = len(state['rounds']) + 1
+        user_content = debate['prompt'] if round_number == 1 else REBUTTAL_PROMPT
+        options = {'seed': debate['seed']}
+
+        transcript.append({"role": "user", "content": user_content})
+
+        responses = {}
+        for i, agent in enumerate(self.agents):
+            full_response = await run_persona_turn(
+                self.client,
+                agent,
+                transcript,
+                user_content,
+                nudge=i > 0,
+                keep_alive=self.keep_alive,
+                options=options
+            )
+            responses[agent['name']] = full_response
+            transcript.append({"role": "assistant", "author": agent["name"], "content": full_response})
+
+        fact_check_content = await run_fact_check(
+            self.client,
+            list(responses.values()),
+            keep_alive=self.keep_alive,
+            options=options
+        )
+
+        return {
+            'debate_id': debate['debate_id'],
+            'prompt_id': debate['prompt_id'],
+            'category': debate['category'],
+            'round': round_number,
+            'user': user_content,
+            'responses': responses,
+            'fact_check': parse_fact_check(fact_check_content),
+            'fact_check_raw': fact_check_content,
+        }
+
+    async def run_debate(self, debate: Dict):
+        state = self.load_checkpoint(debate)
+        # re-emit finished rounds that did not make it into the output
+        for record in state['rounds']:
+            self.emit(record)
+
+        while len(state['rounds']) < self.rounds:
+            record = await self.run_round(state)
+            state['rounds'].append(record)
+            self.save_checkpoint(state)
+            self.emit(record)
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            debate = await queue.get()
+            try:
+                await self.run_debate(debate)
+                self.completed += 1
+            except Exception as e:
+                # the checkpoint keeps the finished rounds, a rerun continues the debate
+                self.failed += 1
+                print(f"Debate {debate['debate_id']} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def run(self, debates: List[Dict]):
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._load_emitted()
+
+        queue = asyncio.Queue()
+        for debate in debates:
+            queue.put_nowait(debate)
+
+        start_time = time.time()
+        with open(self.output_path, 'a', encoding='utf-8') as self._output:
+            workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        elapsed = time.time() - start_time
+        print(f"✓ {self.completed} debates finished, {self.failed} failed in {elapsed:.1f}s")
+        print(f"✓ Rounds streamed to {self.output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run automated persona debates without the front-end.")
+    parser.add_argument("--prompts", default=str(PROMPTS_PATH), help="evaluation prompts used as debate seeds")
+    parser.add_argument("--repeats", type=int, default=1, help="debates per prompt (each with its own seed)")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per debate")
+    parser.add_argument("--concurrency", type=int, default=8, help="debates running at the same time")
+    parser.add_argument("--max-inflight-per-model", type=int, default=1,
+                        help="parallel requests per model, should match OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--keep-alive", default="10m", help="how long Ollama keeps the models loaded")
+    parser.add_argument("--output", default="debates/debates.jsonl", help="JSONL file the rounds are written to")
+    parser.add_argument("--checkpoints", default="debates/checkpoints", help="checkpoint folder")
+    args = parser.parse_args()
+
+    client = ThrottledClient(get_router().async_client(), args.max_inflight_per_model)
+    engine = DebateEngine(
+        client,
+        output_path=args.output,
+        checkpoint_dir=args.checkpoints,
+        rounds=args.rounds,
+        concurrency=args.concurrency,
+        keep_alive=args.keep_alive
+    )
+    asyncio.run(engine.run(load_debates(args.prompts, args.repeats)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,48 +2,36 @@
 Analyze fact-checker results for false positives, false negatives, etc.
 """
 
-import json
-from pathlib import Path
+import sys
 
+from metrics import ConfusionCounter
+from result_shards import iter_results
 
-def analyze_results(json_file: str = "fact_checker_results.json"):
-    """Analyze fact-checker results and compute confusion matrix metrics."""
 
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+def analyze_results(json_file: str = "fact_checker_results.json", max_examples: int = 50):
+    """
+    Analyze fact-checker results and compute confusion matrix metrics.
 
-    results = data['evaluation_results']
+    Args:
+        json_file: Results JSON file, or a directory of JSONL result shards
+        max_examples: Number of false positives/negatives printed
+    """
 
-    # Initialize counters
-    true_positives = []   # FALSE claim correctly detected
-    true_negatives = []   # TRUE claim correctly passed
-    false_positives = []  # TRUE claim incorrectly flagged as false
-    false_negatives = []  # FALSE claim missed (not detected)
+    # Single pass over the results, only counts and a few examples are kept
+    counter = ConfusionCounter(max_examples=max_examples)
+    for r in iter_results(json_file):
+        counter.add(r)
 
-    for r in results:
-        expected = r['expected']
-        correct = r['correct']
-
-        if expected == "FALSE" and correct:
-            true_positives.append(r)
-        elif expected == "TRUE" and correct:
-            true_negatives.append(r)
-        elif expected == "TRUE" and not correct:
-            false_positives.append(r)
-        elif expected == "FALSE" and not correct:
-            false_negatives.append(r)
-
-    # Calculate metrics
-    tp = len(true_positives)
-    tn = len(true_negatives)
-    fp = len(false_positives)
-    fn = len(false_negatives)
-
-    total = tp + tn + fp + fn
-    accuracy = (tp + tn) / total * 100 if total > 0 else 0
-    precision = tp / (tp + fp) * 100 if (tp + fp) > 0 else 0
-    recall = tp / (tp + fn) * 100 if (tp + fn) > 0 else 0
-    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    overall = counter.metrics()
+    tp = overall['true_positives']
+    tn = overall['true_negatives']
+    fp = overall['false_positives']
+    fn = overall['false_negatives']
+    total = overall['total']
+    accuracy = overall['accuracy']
+    precision = overall['precision']
+    recall = overall['recall']
+    f1 = overall['f1']
 
     # Print summary
     print("=" * 70)
@@ -69,22 +57,18 @@ def analyze_results(json_file: str = "fact_checker_results.json"):
     print(f"  F1 Score:   {f1:.2f}%")
 
     # Print false positives details
-    if false_positives:
+    if fp:
         print("\n" + "=" * 70)
         print(f"FALSE POSITIVES ({fp}) - TRUE claims incorrectly flagged")
         print("=" * 70)
-        for r in false_positives:
-            print(f"\n[{r['claim_number']}] {r['party']}: {r['claim']}")
-            print(f"    Response: {r['response'][:150]}...")
+        _print_examples(counter.examples['fp'], fp)
 
     # Print false negatives details
-    if false_negatives:
+    if fn:
         print("\n" + "=" * 70)
         print(f"FALSE NEGATIVES ({fn}) - FALSE claims NOT detected")
         print("=" * 70)
-        for r in false_negatives:
-            print(f"\n[{r['claim_number']}] {r['party']}: {r['claim']}")
-            print(f"    Response: {r['response'][:150]}...")
+        _print_examples(counter.examples['fn'], fn)
 
     # Party-wise analysis
     print("\n" + "=" * 70)
@@ -92,19 +76,15 @@ def analyze_results(json_file: str = "fact_checker_results.json"):
     print("=" * 70)
 
     for party in ["DEM", "REP"]:
-        party_results = [r for r in results if r['party'] == party]
-        party_fp = [r for r in false_positives if r['party'] == party]
-        party_fn = [r for r in false_negatives if r['party'] == party]
-        party_tp = [r for r in true_positives if r['party'] == party]
-        party_tn = [r for r in true_negatives if r['party'] == party]
-
-        p_total = len(party_results)
-        p_correct = len(party_tp) + len(party_tn)
-        p_accuracy = p_correct / p_total * 100 if p_total > 0 else 0
+        party_metrics = counter.metrics(party)
+        p_total = party_metrics['total']
+        p_correct = party_metrics['true_positives'] + party_metrics['true_negatives']
+        p_accuracy = party_metrics['accuracy']
 
         print(f"\n{party}:")
         print(f"  Total: {p_total}, Correct: {p_correct}, Accuracy: {p_accuracy:.2f}%")
-        print(f"  TP: {len(party_tp)}, TN: {len(party_tn)}, FP: {len(party_fp)}, FN: {len(party_fn)}")
+        print(f"  TP: {party_metrics['true_positives']}, TN: {party_metrics['true_negatives']}, "
+              f"FP: {party_metrics['false_positives']}, FN: {party_metrics['false_negatives']}")
 
     print("\n" + "=" * 70)
 
@@ -120,5 +100,18 @@ def analyze_results(json_file: str = "fact_checker_results.json"):
     }
 
 
+def _print_examples(examples, count):
+    for r in examples:
+        print(f"\n[{r['claim_number']}] {r['party']}: {r['claim']}")
+        print(f"    Response: {r['response'][:150]}...")
+    if len(examples) < count:
+        print(f"\n... and {count - len(examples)} more")
+
+
 if __name__ == "__main__":
-    analyze_results()
+    # arguments: results JSON files or shard directories, several runs are compared
+    if len(sys.argv) > 2:
+        from multi_run_analysis import analyze_runs
+        analyze_runs(sys.argv[1:])
+    else:
+        analyze_results(*sys.argv[1:2])
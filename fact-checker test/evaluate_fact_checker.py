@@ -4,13 +4,23 @@ Uses HammerAI/mistral-nemo-uncensored:latest with fact-checker.mf system prompt
 Evaluates performance on claims.txt
 """
 
-import ollama
+import argparse
+import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 import json
 import re
 
+# the record/replay layer and the model provisioning live in the project root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ollama_cassette import CassetteMiss, get_cassette, timed_chat
+from modelfile import parse_modelfile
+from provision_models import DEFAULT_MODELS, PROJECT_DIR, ensure_models
+
+from metrics import ConfusionCounter
+from result_shards import ShardWriter
+
 
 class FactCheckerEvaluator:
     """Evaluates a fact-checker model using claims from a file."""
@@ -26,53 +36,18 @@ class FactCheckerEvaluator:
         self.model_name = model_name
         self.modelfile_path = Path(modelfile_path)
         self.results = []
+        # model information of a rescored results file, kept when the results are saved again
+        self.rescored_model_info = None
         
     def parse_modelfile(self) -> dict:
         """Parse a Modelfile and extract its components."""
-        with open(self.modelfile_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        result = {'parameters': {}}
-
-        # Extract FROM
-        from_match = re.search(r'^FROM\s+(.+)$', content, re.MULTILINE)
-        if from_match:
-            result['from_'] = from_match.group(1).strip()
-
-        # Extract SYSTEM (handles multi-line with triple quotes)
-        system_match = re.search(r'SYSTEM\s+"""(.*?)"""', content, re.DOTALL)
-        if system_match:
-            result['system'] = system_match.group(1).strip()
-
-        # Extract PARAMETERs
-        for param_match in re.finditer(r'^PARAMETER\s+(\w+)\s+(.+)$', content, re.MULTILINE):
-            key = param_match.group(1)
-            value = param_match.group(2).strip()
-            # Try to convert to appropriate type
-            try:
-                value = float(value)
-            except ValueError:
-                pass
-            result['parameters'][key] = value
-
-        return result
-
-    def create_model(self):
-        """Create the fact-checker model from the modelfile."""
-        print(f"Creating model '{self.model_name}' from {self.modelfile_path}...")
+        return parse_modelfile(self.modelfile_path)
 
+    def create_model(self, force: bool = False):
+        """Create the fact-checker model from the modelfile, unless it is up to date."""
         try:
-            # Parse the modelfile
-            config = self.parse_modelfile()
-
-            # Create the model using ollama
-            ollama.create(
-                model=self.model_name,
-                from_=config.get('from_'),
-                system=config.get('system'),
-                parameters=config.get('parameters') or None
-            )
-            print(f"✓ Model '{self.model_name}' created successfully")
+            # Only rebuilt when the modelfile or the base model changed
+            ensure_models({self.model_name: self.modelfile_path}, force=force)
 
         except Exception as e:
             print(f"✗ Error creating model: {e}")
@@ -88,8 +63,18 @@ class FactCheckerEvaluator:
         Returns:
             List of claim dictionaries with party, expected_result, and text
         """
-        claims = []
+        return list(self.iter_claims(claims_file))
+    
+    def iter_claims(self, claims_file: str) -> Iterator[Dict]:
+        """
+        Lazily parse a claims file, one line at a time.
         
+        Args:
+            claims_file: Path to claims file
+            
+        Yields:
+            Claim dictionaries with party, expected_result, and text
+        """
         with open(claims_file, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
@@ -100,13 +85,11 @@ class FactCheckerEvaluator:
                 match = re.match(r'\[([A-Z]+)\]\[([A-Z]+)\]\s+(.+)', line)
                 if match:
                     party, expected, claim_text = match.groups()
-                    claims.append({
+                    yield {
                         'party': party,
                         'expected': expected,
                         'text': claim_text
-                    })
-        
-        return claims
+                    }
     
     def check_claim(self, claim_text: str) -> Tuple[str, float]:
         """
@@ -121,7 +104,8 @@ class FactCheckerEvaluator:
         start_time = time.time()
         
         try:
-            response = ollama.chat(
+            # replayed responses report the response time measured at recording time
+            response, response_time = timed_chat(
                 model=self.model_name,
                 messages=[
                     {
@@ -131,11 +115,13 @@ class FactCheckerEvaluator:
                 ]
             )
             
-            response_time = time.time() - start_time
             response_text = response['message']['content'].strip()
             
             return response_text, response_time
             
+        except CassetteMiss:
+            # a missing recording is not a model error, replay must not silently score it
+            raise
         except Exception as e:
             print(f"Error checking claim: {e}")
             return f"ERROR: {e}", time.time() - start_time
@@ -187,9 +173,6 @@ class FactCheckerEvaluator:
         claims = self.parse_claims_file(claims_file)
         print(f"Found {len(claims)} claims to evaluate\n")
         
-        correct_count = 0
-        total_time = 0
-        
         for idx, claim in enumerate(claims, 1):
             print(f"[{idx}/{len(claims)}] Evaluating: {claim['text'][:60]}...")
             
@@ -209,52 +192,94 @@ class FactCheckerEvaluator:
             self.results.append(result)
             
             if evaluation['correct']:
-                correct_count += 1
                 status = "✓ CORRECT"
             else:
                 status = "✗ INCORRECT"
             
             print(f"  {status} (Expected: {claim['expected']}, Time: {response_time:.2f}s)")
             print(f"  Response: {response[:100]}{'...' if len(response) > 100 else ''}\n")
-            
-            total_time += response_time
         
-        # Calculate statistics
-        accuracy = (correct_count / len(claims)) * 100 if claims else 0
-        avg_time = total_time / len(claims) if claims else 0
+        return self.compute_statistics()
+    
+    def compute_statistics(self) -> Dict:
+        """
+        Compute evaluation statistics from the stored results.
+        
+        Returns:
+            Dictionary with evaluation statistics
+        """
+        counter = ConfusionCounter(max_examples=0)
+        for result in self.results:
+            counter.add(result)
+        
+        return counter.statistics()
+    
+    def rescore_results(self, results_file: str = "fact_checker_results.json") -> Dict:
+        """
+        Re-apply evaluate_response to the responses of an earlier run.
+        
+        No model calls are made, so changes to the scoring rules can be
+        checked against an existing results file in seconds.
         
-        # Party-wise statistics
-        dem_results = [r for r in self.results if r['party'] == 'DEM']
-        rep_results = [r for r in self.results if r['party'] == 'REP']
+        Args:
+            results_file: Path to a results file written by save_results
+            
+        Returns:
+            Dictionary with evaluation statistics
+        """
+        with open(results_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
         
-        dem_accuracy = (sum(1 for r in dem_results if r['correct']) / len(dem_results) * 100) if dem_results else 0
-        rep_accuracy = (sum(1 for r in rep_results if r['correct']) / len(rep_results) * 100) if rep_results else 0
+        self.rescored_model_info = data.get('model_info')
+        self.results = []
+        for result in data['evaluation_results']:
+            evaluation = self.evaluate_response(result['response'], result['expected'])
+            self.results.append({**result, **evaluation})
         
-        # True/False claim statistics
-        true_claims = [r for r in self.results if r['expected'] == 'TRUE']
-        false_claims = [r for r in self.results if r['expected'] == 'FALSE']
+        return self.compute_statistics()
+    
+    def evaluate_claims_streaming(self, claims_file: str, output_dir: str, shard_size: int = 10000) -> Dict:
+        """
+        Evaluate a claims file of any size in bounded memory.
         
-        true_accuracy = (sum(1 for r in true_claims if r['correct']) / len(true_claims) * 100) if true_claims else 0
-        false_accuracy = (sum(1 for r in false_claims if r['correct']) / len(false_claims) * 100) if false_claims else 0
+        Claims are read lazily, results are written to JSONL shards as they
+        arrive (see result_shards.py) and the statistics are updated
+        incrementally instead of keeping every result in self.results.
         
-        stats = {
-            'total_claims': len(claims),
-            'correct': correct_count,
-            'incorrect': len(claims) - correct_count,
-            'overall_accuracy': accuracy,
-            'average_response_time': avg_time,
-            'total_time': total_time,
-            'dem_accuracy': dem_accuracy,
-            'rep_accuracy': rep_accuracy,
-            'true_claim_accuracy': true_accuracy,
-            'false_claim_accuracy': false_accuracy,
-            'dem_claims': len(dem_results),
-            'rep_claims': len(rep_results),
-            'true_claims_count': len(true_claims),
-            'false_claims_count': len(false_claims)
-        }
+        Args:
+            claims_file: Path to claims file
+            output_dir: Directory for the result shards
+            shard_size: Number of results per shard
+            
+        Returns:
+            Dictionary with evaluation statistics
+        """
+        print(f"\nStreaming evaluation of {claims_file} into {output_dir}...")
+        counter = ConfusionCounter(max_examples=0)
+        
+        with ShardWriter(output_dir, self.model_info(), shard_size) as writer:
+            for idx, claim in enumerate(self.iter_claims(claims_file), 1):
+                response, response_time = self.check_claim(claim['text'])
+                evaluation = self.evaluate_response(response, claim['expected'])
+                
+                result = {
+                    'claim_number': idx,
+                    'party': claim['party'],
+                    'claim': claim['text'],
+                    'expected': claim['expected'],
+                    'response': response,
+                    'response_time': response_time,
+                    **evaluation
+                }
+                writer.write(result)
+                counter.add(result)
+                
+                if idx % 100 == 0:
+                    stats = counter.statistics()
+                    print(f"[{idx}] Accuracy so far: {stats['overall_accuracy']:.2f}%")
         
-        return stats
+        print(f"✓ {writer.written} results saved to {output_dir}")
+        return counter.statistics()
     
     def print_summary(self, stats: Dict):
         """Print evaluation summary."""
@@ -280,14 +305,23 @@ class FactCheckerEvaluator:
         print(f"Total Evaluation Time: {stats['total_time']:.2f}s ({stats['total_time']/60:.2f} minutes)")
         print("="*70 + "\n")
     
+    def model_info(self) -> Dict:
+        """Model information stored with the results."""
+        # relative to the project root, results files are compared across machines
+        modelfile = self.modelfile_path.resolve()
+        if modelfile.is_relative_to(PROJECT_DIR):
+            modelfile = modelfile.relative_to(PROJECT_DIR)
+        return {
+            'model_name': self.model_name,
+            'base_model': 'HammerAI/mistral-nemo-uncensored:latest',
+            'modelfile': modelfile.as_posix()
+        }
+    
     def save_results(self, output_file: str = "fact_checker_results.json"):
         """Save detailed results to JSON file."""
         results_data = {
-            'model_info': {
-                'model_name': self.model_name,
-                'base_model': 'HammerAI/mistral-nemo-uncensored:latest',
-                'modelfile': str(self.modelfile_path)
-            },
+            # rescored results keep the model information of the run that produced the responses
+            'model_info': self.rescored_model_info or self.model_info(),
             'evaluation_results': self.results
         }
         
@@ -299,23 +333,56 @@ class FactCheckerEvaluator:
 
 def main():
     """Main evaluation function."""
+    parser = argparse.ArgumentParser(description="Evaluate the fact-checker model on claims.txt")
+    parser.add_argument(
+        "--rescore",
+        metavar="RESULTS_FILE",
+        help="re-score the responses in an existing results file instead of querying the model"
+    )
+    parser.add_argument(
+        "--output",
+        help="results file to write (default: fact_checker_results.json, or RESULTS_FILE.rescored.json with --rescore)"
+    )
+    parser.add_argument("--claims", default="claims.txt", help="claims file to evaluate")
+    parser.add_argument(
+        "--shards",
+        metavar="OUTPUT_DIR",
+        help="stream results to JSONL shards in OUTPUT_DIR (bounded memory, for large claim corpora)"
+    )
+    parser.add_argument("--shard-size", type=int, default=10000, help="results per shard")
+    parser.add_argument("--rebuild", action="store_true", help="recreate the model even if its modelfile did not change")
+    args = parser.parse_args()
+
     # Initialize evaluator
     evaluator = FactCheckerEvaluator(
         model_name="fact-checker",
-        modelfile_path="fact-checker.mf"
+        modelfile_path=DEFAULT_MODELS["fact-checker"]
     )
     
-    # Create the model
-    evaluator.create_model()
-    
-    # Evaluate all claims
-    stats = evaluator.evaluate_all_claims("claims.txt")
+    if args.rescore:
+        # Re-score stored responses, no model is needed
+        stats = evaluator.rescore_results(args.rescore)
+        output_file = args.output or str(Path(args.rescore).with_suffix('.rescored.json'))
+    else:
+        # Create the model (not needed when replaying recorded responses)
+        if not get_cassette().replaying:
+            evaluator.create_model(force=args.rebuild)
+        
+        if args.shards:
+            # Evaluate claims lazily, results are already saved in the shards
+            stats = evaluator.evaluate_claims_streaming(args.claims, args.shards, args.shard_size)
+            evaluator.print_summary(stats)
+            return
+        
+        # Evaluate all claims
+        stats = evaluator.evaluate_all_claims(args.claims)
+        output_file = args.output or "fact_checker_results.json"
     
     # Print summary
     evaluator.print_summary(stats)
     
     # Save results
-    evaluator.save_results("fact_checker_results.json")
+    evaluator.save_results(output_file)
 
 
 if __name__ == "__main__":
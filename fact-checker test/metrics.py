@@ -0,0 +1,110 @@
+"""
+Incremental confusion matrix for fact-checker results.
+
+Results are added one at a time, so metrics for arbitrarily large claim corpora
+are computed in a single pass and in bounded memory.
+"""
+
+from typing import Dict, List, Optional
+
+# A positive is a FALSE claim (the fact-checker should flag it)
+CELLS = ("tp", "tn", "fp", "fn")
+
+
+def confusion_cell(expected: str, correct: bool) -> str:
+    """Confusion matrix cell of a single result."""
+    if expected == "FALSE":
+        return "tp" if correct else "fn"
+    return "tn" if correct else "fp"
+
+
+class ConfusionCounter:
+    """Accumulates confusion matrix counts overall and per party."""
+
+    def __init__(self, max_examples: Optional[int] = 50):
+        """
+        Initialize the counter.
+
+        Args:
+            max_examples: Number of false positives/negatives kept for printing, None keeps all
+        """
+        self.max_examples = max_examples
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.total_time = 0.0
+        self.examples: Dict[str, List[Dict]] = {"fp": [], "fn": []}
+
+    def add(self, result: Dict):
+        """Add one result (needs 'party', 'expected', 'correct' and 'response_time')."""
+        cell = confusion_cell(result['expected'], result['correct'])
+        party_counts = self.counts.setdefault(result['party'], dict.fromkeys(CELLS, 0))
+        party_counts[cell] += 1
+        self.total_time += result.get('response_time', 0.0)
+
+        if cell in self.examples and (self.max_examples is None or len(self.examples[cell]) < self.max_examples):
+            self.examples[cell].append({
+                'claim_number': result.get('claim_number'),
+                'party': result['party'],
+                'claim': result['claim'],
+                'response': result['response'][:150],
+            })
+
+    @property
+    def parties(self) -> List[str]:
+        return list(self.counts)
+
+    def matrix(self, party: Optional[str] = None) -> Dict[str, int]:
+        """Confusion matrix counts for one party or, without a party, for all results."""
+        if party is not None:
+            return dict(self.counts.get(party, dict.fromkeys(CELLS, 0)))
+        return {cell: sum(c[cell] for c in self.counts.values()) for cell in CELLS}
+
+    def metrics(self, party: Optional[str] = None) -> Dict:
+        """Confusion matrix with accuracy, precision, recall and F1 in percent."""
+        m = self.matrix(party)
+        tp, tn, fp, fn = m['tp'], m['tn'], m['fp'], m['fn']
+        total = tp + tn + fp + fn
+        accuracy = (tp + tn) / total * 100 if total > 0 else 0
+        precision = tp / (tp + fp) * 100 if (tp + fp) > 0 else 0
+        recall = tp / (tp + fn) * 100 if (tp + fn) > 0 else 0
+        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+        return {
+            'true_positives': tp,
+            'true_negatives': tn,
+            'false_positives': fp,
+            'false_negatives': fn,
+            'total': total,
+            'accuracy': accuracy,
+            'precision': precision,
+            'recall': recall,
+            'f1': f1,
+        }
+
+    def statistics(self) -> Dict:
+        """Statistics in the format of FactCheckerEvaluator.evaluate_all_claims."""
+        m = self.matrix()
+        dem = self.matrix('DEM')
+        rep = self.matrix('REP')
+
+        def accuracy(c, cells=CELLS):
+            n = sum(c[cell] for cell in cells)
+            correct = sum(c[cell] for cell in cells if cell in ('tp', 'tn'))
+            return correct / n * 100 if n else 0
+
+        total = sum(m.values())
+        correct = m['tp'] + m['tn']
+        return {
+            'total_claims': total,
+            'correct': correct,
+            'incorrect': total - correct,
+            'overall_accuracy': accuracy(m),
+            'average_response_time': self.total_time / total if total else 0,
+            'total_time': self.total_time,
+            'dem_accuracy': accuracy(dem),
+            'rep_accuracy': accuracy(rep),
+            'true_claim_accuracy': accuracy(m, ('tn', 'fp')),
+            'false_claim_accuracy': accuracy(m, ('tp', 'fn')),
+            'dem_claims': sum(dem.values()),
+            'rep_claims': sum(rep.values()),
+            'true_claims_count': m['tn'] + m['fp'],
+            'false_claims_count': m['tp'] + m['fn'],
+        }
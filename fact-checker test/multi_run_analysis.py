@@ -0,0 +1,300 @@
+"""
+Vectorised analysis of many fact-checker runs.
+
+All runs are loaded into flat numpy arrays and the confusion matrices for every
+run x group (all claims, each party, TRUE and FALSE claims) are computed with a
+single bincount. Uncertainty:
+    - bootstrap confidence intervals: resampling claims with replacement only changes
+      the confusion matrix counts, so each bootstrap replicate is one multinomial draw
+      of the four cells (no per-claim loop, fast for thousands of runs). Replicates are
+      drawn for RUN_BLOCK_SIZE runs at a time and reduced to percentiles right away, so
+      memory stays bounded however many runs are analyzed
+    - paired comparisons against a reference run on the claims both runs evaluated:
+      McNemar's test on accuracy and a paired bootstrap of the F1 difference
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from metrics import CELLS, confusion_cell
+from result_shards import iter_results
+
+CELL_INDEX = {cell: i for i, cell in enumerate(CELLS)}
+
+CLAIM_TYPES = ["TRUE", "FALSE"]
+
+# runs bootstrapped together, the replicates of one block are (n_bootstrap, block, ...) arrays
+RUN_BLOCK_SIZE = 64
+
+
+class RunSet:
+    """Results of several runs as flat arrays (one entry per evaluated claim)."""
+
+    def __init__(self, names: List[str], run: np.ndarray, party: np.ndarray, claim_type: np.ndarray,
+                 cell: np.ndarray, claim: np.ndarray, parties: List[str], claims: List[tuple]):
+        self.names = names
+        self.run = run
+        self.party = party
+        self.claim_type = claim_type
+        self.cell = cell
+        self.claim = claim
+        self.parties = parties
+        self.claims = claims
+
+    @property
+    def groups(self) -> List[str]:
+        """Names of the second axis of the count arrays."""
+        return ["ALL"] + self.parties + [f"{t} claims" for t in CLAIM_TYPES]
+
+
+def load_runs(paths: List[str], names: Optional[List[str]] = None) -> RunSet:
+    """
+    Load results files or shard directories into a RunSet.
+
+    Args:
+        paths: One results JSON file or shard directory per run
+        names: Run names, defaults to the paths
+    """
+    party_index: Dict[str, int] = {}
+    claim_index: Dict[tuple, int] = {}
+    run, party, claim_type, cell, claim = [], [], [], [], []
+
+    for run_number, path in enumerate(paths):
+        for r in iter_results(path):
+            # claims are matched across runs by their content, not by their position
+            key = (r['party'], r['expected'], r['claim'])
+            run.append(run_number)
+            party.append(party_index.setdefault(r['party'], len(party_index)))
+            claim_type.append(CLAIM_TYPES.index(r['expected']))
+            cell.append(CELL_INDEX[confusion_cell(r['expected'], r['correct'])])
+            claim.append(claim_index.setdefault(key, len(claim_index)))
+
+    return RunSet(
+        names=list(names or paths),
+        run=np.asarray(run, dtype=np.int64),
+        party=np.asarray(party, dtype=np.int64),
+        claim_type=np.asarray(claim_type, dtype=np.int64),
+        cell=np.asarray(cell, dtype=np.int64),
+        claim=np.asarray(claim, dtype=np.int64),
+        parties=list(party_index),
+        claims=list(claim_index),
+    )
+
+
+def confusion_counts(runs: RunSet) -> np.ndarray:
+    """Confusion matrix counts of shape (runs, groups, 4) with cells ordered as CELLS."""
+    n_runs = len(runs.names)
+    n_parties = len(runs.parties)
+    n_cells = len(CELLS)
+
+    by_party = np.bincount(
+        (runs.run * n_parties + runs.party) * n_cells + runs.cell,
+        minlength=n_runs * n_parties * n_cells
+    ).reshape(n_runs, n_parties, n_cells)
+    by_type = np.bincount(
+        (runs.run * len(CLAIM_TYPES) + runs.claim_type) * n_cells + runs.cell,
+        minlength=n_runs * len(CLAIM_TYPES) * n_cells
+    ).reshape(n_runs, len(CLAIM_TYPES), n_cells)
+
+    return np.concatenate([by_party.sum(axis=1, keepdims=True), by_party, by_type], axis=1)
+
+
+def compute_metrics(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Accuracy, precision, recall and F1 in percent for counts of shape (..., 4).
+    Undefined values (e.g. precision without any flagged claim) are NaN.
+    """
+    counts = counts.astype(np.float64)
+    tp, tn, fp, fn = (counts[..., CELL_INDEX[c]] for c in CELLS)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        accuracy = (tp + tn) / (tp + tn + fp + fn) * 100
+        precision = tp / (tp + fp) * 100
+        recall = tp / (tp + fn) * 100
+        f1 = 2 * precision * recall / (precision + recall)
+    return {'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def bootstrap_counts(counts: np.ndarray, n_bootstrap: int = 2000, seed: Optional[int] = 0,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Bootstrap replicates of counts, shape (n_bootstrap, *counts.shape)."""
+    rng = rng or np.random.default_rng(seed)
+    totals = counts.sum(axis=-1)
+    # runs without results get uniform probabilities, their total of 0 makes every draw 0
+    pvals = np.where(totals[..., None] > 0, counts / np.maximum(totals[..., None], 1), 1 / counts.shape[-1])
+    return rng.multinomial(totals, pvals, size=(n_bootstrap, *totals.shape))
+
+
+def _percentiles(values: np.ndarray, q: List[float]) -> List[np.ndarray]:
+    """Linear percentiles along the first axis ignoring NaN (much faster than np.nanpercentile)."""
+    ordered = np.sort(values, axis=0)  # NaN is sorted to the end
+    valid = (~np.isnan(ordered)).sum(axis=0)
+    result = []
+    for percentile in q:
+        position = percentile / 100 * np.maximum(valid - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = np.take_along_axis(ordered, lower[None], axis=0)[0]
+        high_values = np.take_along_axis(ordered, upper[None], axis=0)[0]
+        interpolated = low_values + (high_values - low_values) * (position - lower)
+        result.append(np.where(valid > 0, interpolated, np.nan))
+    return result
+
+
+def _run_blocks(n_runs: int, block_size: int):
+    for start in range(0, n_runs, block_size):
+        yield slice(start, min(start + block_size, n_runs))
+
+
+def bootstrap_intervals(counts: np.ndarray, n_bootstrap: int = 2000, confidence: float = 0.95,
+                        seed: Optional[int] = 0, block_size: int = RUN_BLOCK_SIZE) -> Dict[str, np.ndarray]:
+    """Percentile intervals, {metric: array of shape (*counts.shape[:-1], 2)}."""
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2 * 100
+    intervals = {}
+    for block in _run_blocks(counts.shape[0], block_size):
+        samples = compute_metrics(bootstrap_counts(counts[block], n_bootstrap, rng=rng))
+        for metric, values in samples.items():
+            low, high = _percentiles(values, [alpha, 100 - alpha])
+            intervals.setdefault(metric, np.empty((*counts.shape[:-1], 2)))[block] = np.stack([low, high], axis=-1)
+    return intervals
+
+
+def _claim_matrix(runs: RunSet) -> np.ndarray:
+    """Confusion cell of every (run, claim), -1 where a run did not evaluate a claim."""
+    matrix = np.full((len(runs.names), len(runs.claims)), -1, dtype=np.int64)
+    matrix[runs.run, runs.claim] = runs.cell
+    return matrix
+
+
+def _mcnemar_p_value(b: int, c: int) -> float:
+    # exact two-sided binomial test for small samples, continuity-corrected chi-square otherwise
+    n = b + c
+    if n == 0:
+        return 1.0
+    if n <= 50:
+        tail = sum(math.comb(n, k) for k in range(min(b, c) + 1)) / 2 ** n
+        return min(1.0, 2 * tail)
+    statistic = (abs(b - c) - 1) ** 2 / n
+    return math.erfc(math.sqrt(statistic / 2))
+
+
+def paired_comparison(runs: RunSet, reference: int = 0, n_bootstrap: int = 2000,
+                      confidence: float = 0.95, seed: Optional[int] = 0,
+                      block_size: int = RUN_BLOCK_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Compare every run with the reference run on the claims both evaluated.
+
+    Returns:
+        Arrays of length n_runs: shared claims, accuracy and F1 difference (run - reference),
+        the F1 difference interval (paired bootstrap) and McNemar's p-value on accuracy
+    """
+    matrix = _claim_matrix(runs)
+    ref = matrix[reference]
+    shared = (matrix >= 0) & (ref >= 0)
+
+    correct = np.isin(matrix, [CELL_INDEX['tp'], CELL_INDEX['tn']])
+    ref_correct = correct[reference]
+    # discordant pairs: only the reference is correct (b) / only the run is correct (c)
+    b = (shared & ref_correct & ~correct).sum(axis=1)
+    c = (shared & ~ref_correct & correct).sum(axis=1)
+    p_values = np.array([_mcnemar_p_value(int(bi), int(ci)) for bi, ci in zip(b, c)])
+
+    # joint cell (reference cell, run cell) of every shared claim, 16 categories per run
+    n_cells = len(CELLS)
+    joint = np.where(shared, ref * n_cells + matrix, -1)
+    run_ids = np.broadcast_to(np.arange(len(runs.names))[:, None], joint.shape)
+    valid = joint >= 0
+    joint_counts = np.bincount(
+        run_ids[valid] * n_cells ** 2 + joint[valid],
+        minlength=len(runs.names) * n_cells ** 2
+    ).reshape(len(runs.names), n_cells ** 2)
+
+    def marginals(joint_counts):
+        grid = joint_counts.reshape(*joint_counts.shape[:-1], n_cells, n_cells)
+        return grid.sum(axis=-1), grid.sum(axis=-2)
+
+    ref_counts, run_counts = marginals(joint_counts)
+    observed_ref = compute_metrics(ref_counts)
+    observed_run = compute_metrics(run_counts)
+
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2 * 100
+    f1_diff_interval = np.empty((len(runs.names), 2))
+    for block in _run_blocks(len(runs.names), block_size):
+        samples_ref, samples_run = marginals(bootstrap_counts(joint_counts[block], n_bootstrap, rng=rng))
+        f1_diff = compute_metrics(samples_run)['f1'] - compute_metrics(samples_ref)['f1']
+        f1_diff_interval[block] = np.stack(_percentiles(f1_diff, [alpha, 100 - alpha]), axis=-1)
+
+    return {
+        'shared_claims': shared.sum(axis=1),
+        'accuracy_diff': observed_run['accuracy'] - observed_ref['accuracy'],
+        'f1_diff': observed_run['f1'] - observed_ref['f1'],
+        'f1_diff_interval': f1_diff_interval,
+        'mcnemar_p': p_values,
+    }
+
+
+def _format(value, interval=None) -> str:
+    if np.isnan(value):
+        return f"{'-':>22}"
+    if interval is None or np.isnan(interval).any():
+        return f"{value:>7.2f}{'':>15}"
+    return f"{value:>7.2f} [{interval[0]:6.2f},{interval[1]:6.2f}]"
+
+
+def analyze_runs(paths: List[str], reference: int = 0, n_bootstrap: int = 2000,
+                 confidence: float = 0.95, seed: Optional[int] = 0) -> Dict:
+    """
+    Analyze several results files (or shard directories) at once and print the summary.
+
+    Args:
+        paths: One results JSON file or shard directory per run
+        reference: Index of the run the others are compared with
+        n_bootstrap: Number of bootstrap replicates
+        confidence: Confidence level of the intervals
+        seed: Seed of the bootstrap
+    """
+    runs = load_runs(paths)
+    counts = confusion_counts(runs)
+    metrics = compute_metrics(counts)
+    intervals = bootstrap_intervals(counts, n_bootstrap, confidence, seed)
+    comparison = paired_comparison(runs, reference, n_bootstrap, confidence, seed)
+
+    level = f"{confidence * 100:.0f}%"
+    print("=" * 100)
+    print(f"FACT-CHECKER MULTI-RUN ANALYSIS ({len(runs.names)} runs, {level} bootstrap intervals)")
+    print("=" * 100)
+    for group_index, group in enumerate(runs.groups):
+        print(f"\n{group}")
+        print(f"  {'run':<30}{'n':>6}  {'accuracy':^22}  {'precision':^22}  {'recall':^22}  {'f1':^22}")
+        for run_index, name in enumerate(runs.names):
+            n = counts[run_index, group_index].sum()
+            line = f"  {name[-30:]:<30}{n:>6}"
+            for metric in ['accuracy', 'precision', 'recall', 'f1']:
+                line += "  " + _format(metrics[metric][run_index, group_index],
+                                       intervals[metric][run_index, group_index])
+            print(line)
+
+    print("\n" + "-" * 100)
+    print(f"PAIRED COMPARISON WITH {runs.names[reference]} (shared claims only)")
+    print("-" * 100)
+    print(f"  {'run':<30}{'shared':>8}  {'Δ accuracy':>10}  {'McNemar p':>10}  {'Δ F1 [' + level + ' CI]':>26}")
+    for run_index, name in enumerate(runs.names):
+        if run_index == reference:
+            continue
+        print(f"  {name[-30:]:<30}{comparison['shared_claims'][run_index]:>8}"
+              f"  {comparison['accuracy_diff'][run_index]:>10.2f}"
+              f"  {comparison['mcnemar_p'][run_index]:>10.4f}"
+              f"  {_format(comparison['f1_diff'][run_index], comparison['f1_diff_interval'][run_index]):>26}")
+    print("=" * 100)
+
+    return {
+        'runs': runs.names,
+        'groups': runs.groups,
+        'counts': counts,
+        'metrics': metrics,
+        'intervals': intervals,
+        'comparison': comparison,
+    }
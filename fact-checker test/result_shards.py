@@ -0,0 +1,86 @@
+"""
+JSONL shards for fact-checker results.
+
+A results directory contains a model_info.json manifest and results-00000.jsonl,
+results-00001.jsonl, ... with one result per line. Shards are written and read one
+line at a time, so evaluations of large claim corpora run in bounded memory.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator
+
+SHARD_PATTERN = "results-*.jsonl"
+
+MODEL_INFO_FILE = "model_info.json"
+
+
+class ShardWriter:
+    """Writes results to numbered JSONL shards of at most shard_size lines."""
+
+    def __init__(self, output_dir: str, model_info: Dict, shard_size: int = 10000):
+        """
+        Initialize the writer.
+
+        Args:
+            output_dir: Directory the shards are written to (existing shards are replaced)
+            model_info: Written to model_info.json
+            shard_size: Number of results per shard
+        """
+        self.output_dir = Path(output_dir)
+        self.shard_size = shard_size
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for old_shard in self.output_dir.glob(SHARD_PATTERN):
+            old_shard.unlink()
+
+        with open(self.output_dir / MODEL_INFO_FILE, 'w', encoding='utf-8') as f:
+            json.dump(model_info, f, indent=2, ensure_ascii=False)
+
+        self.written = 0
+        self._file = None
+
+    def write(self, result: Dict):
+        if self.written % self.shard_size == 0:
+            self._open_next_shard()
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self.written += 1
+
+    def _open_next_shard(self):
+        self.close()
+        shard_path = self.output_dir / f"results-{self.written // self.shard_size:05d}.jsonl"
+        self._file = open(shard_path, 'w', encoding='utf-8')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_shard_dir(path: str) -> bool:
+    return Path(path).is_dir()
+
+
+def iter_results(path: str) -> Iterator[Dict]:
+    """
+    Iterate over the results of a run.
+
+    Args:
+        path: A shard directory, or a single results JSON file written by save_results
+    """
+    path = Path(path)
+    if path.is_dir():
+        for shard_path in sorted(path.glob(SHARD_PATTERN)):
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+    else:
+        # single JSON document (small runs)
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)['evaluation_results']
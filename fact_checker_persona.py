@@ -1,4 +1,5 @@
-from ollama import chat, ChatResponse
+from ollama import ChatResponse
+from ollama_cassette import chat
 from typing import Literal, TypedDict
 import json
 import re
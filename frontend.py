@@ -1,9 +1,11 @@
 import chainlit as cl
 from chainlit.input_widget import Select
-import ollama
 
-# Initialize the async client
-client = ollama.AsyncClient()
+from debate import agents_for, parse_fact_check, run_fact_check, run_persona_turn
+from ollama_router import get_router
+
+# Initialize the async client, requests are routed to the Ollama endpoints in ollama_backends.json
+client = get_router().async_client()
 
 
 @cl.on_chat_start
@@ -39,11 +41,7 @@ async def main(message: cl.Message):
     # 1. Add user message to history
     transcript.append({"role": "user", "content": message.content})
 
-    agents_to_run = []
-    if persona_choice in ["Democrat", "Both"]:
-        agents_to_run.append({"name": "Democrat", "model": "dem-model:latest"})
-    if persona_choice in ["Republican", "Both"]:
-        agents_to_run.append({"name": "Republican", "model": "rep-model:latest"})
+    agents_to_run = agents_for(persona_choice)
 
     # Store the current turn's responses here to pass to the Fact Checker
     current_turn_responses = []
@@ -55,29 +53,17 @@ async def main(message: cl.Message):
         agent_msg = cl.Message(content=f"{agent['name']}: ", author=agent["name"])
         await agent_msg.send()
 
-        # If this is NOT the first agent, nudge the model
-        current_context = list(transcript)
-        if i > 0:
-            current_context.append({
-                "role": "user",
-                "content": message.content,
-            })
-
-        full_response = ""
         try:
-            stream = await client.chat(
-                model=agent["model"],
-                messages=current_context,
-                stream=True,
-                keep_alive=0
+            # If this is NOT the first agent, nudge the model
+            full_response = await run_persona_turn(
+                client,
+                agent,
+                transcript,
+                message.content,
+                nudge=i > 0,
+                on_token=agent_msg.stream_token
             )
 
-            async for chunk in stream:
-                token = chunk.get('message', {}).get('content', '')
-                if token:
-                    full_response += token
-                    await agent_msg.stream_token(token)
-
             # pass current response to fact-checker
             current_turn_responses.append(full_response)
 
@@ -94,28 +80,12 @@ async def main(message: cl.Message):
 
     # 3. SIDE PANEL: Fact Checker (Stateless)
     if current_turn_responses:
-        # Create a condensed prompt of only what was just said
-        fact_check_prompt = (f"Analyze the following debate statement or statements for factual accuracy and logical "
-                             f"fallacies. Be objective and brief:\n\n{current_turn_responses}")
-
         try:
-            # Use client.chat() instead of client.generate()
             # The fact checker gets NO conversation history (stateless)
-            response = await client.chat(
-                model='fact-checker:latest',
-                messages=[{"role": "user", "content": fact_check_prompt}],
-                stream=False,
-                keep_alive=0
-            )
-
-            fact_check_content = response['message']['content']
-            separators = ["FACT CHECKER RESPONSE", "Fact Checker Response"]
-            if separators[0] in fact_check_content:
-                separator = separators[0]
-            else:
-                separator = separators[1]
-            fact_check_response = fact_check_content.split(separator, 1)[1][3:] # [3:] ignores ** at the beginning
-            fact_check_response = fact_check_response.replace('"','') # strip " from beginning and end of content
+            fact_check_content = await run_fact_check(client, current_turn_responses)
+            fact_check_response = parse_fact_check(fact_check_content)
+            if fact_check_response is None:
+                raise ValueError("No fact checker response section in the model output")
 
             # Use ElementSidebar instead of display="side"
             await cl.ElementSidebar.set_title("Fact Check Analysis")
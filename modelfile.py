@@ -0,0 +1,69 @@
+"""
+Helpers for reading and writing Ollama Modelfiles.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Union
+
+
+def parse_modelfile(modelfile_path: Union[str, Path]) -> dict:
+    """Parse a Modelfile and extract its components."""
+    with open(modelfile_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    result = {'parameters': {}}
+
+    # Extract FROM
+    from_match = re.search(r'^FROM\s+(.+)$', content, re.MULTILINE)
+    if from_match:
+        result['from_'] = from_match.group(1).strip()
+
+    # Extract SYSTEM (handles multi-line with triple quotes)
+    system_match = re.search(r'SYSTEM\s+"""(.*?)"""', content, re.DOTALL)
+    if system_match:
+        result['system'] = system_match.group(1).strip()
+
+    # Extract PARAMETERs
+    for param_match in re.finditer(r'^PARAMETER\s+(\w+)\s+(.+)$', content, re.MULTILINE):
+        key = param_match.group(1)
+        value = param_match.group(2).strip()
+        # Try to convert to appropriate type
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        result['parameters'][key] = value
+
+    return result
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def set_parameters(content: str, parameters: Dict) -> str:
+    """
+    Return Modelfile content with the given PARAMETERs set.
+
+    Existing PARAMETER lines for these keys are replaced, new ones are added after the
+    last PARAMETER line (or after FROM). Everything else, including the SYSTEM prompt,
+    is kept exactly as it is.
+    """
+    def replaced(line):
+        match = re.match(r'^PARAMETER\s+(\w+)\s', line)
+        return match is not None and match.group(1) in parameters
+
+    kept = [line for line in content.splitlines() if not replaced(line)]
+
+    anchor = None
+    for i, line in enumerate(kept):
+        if line.startswith('PARAMETER') or (anchor is None and line.startswith('FROM')):
+            anchor = i
+    insert_at = anchor + 1 if anchor is not None else 0
+
+    new_lines = [f"PARAMETER {key} {_format_value(value)}" for key, value in parameters.items()]
+    result = kept[:insert_at] + new_lines + kept[insert_at:]
+    return '\n'.join(result) + ('\n' if content.endswith('\n') else '')
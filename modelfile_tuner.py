@@ -0,0 +1,225 @@
+"""
+Modelfile PARAMETER tuner for CPU throughput.
+
+For each Modelfile, the tuner creates a temporary model and measures prompt-eval and
+decode tokens/s and the resident memory (from /api/ps) for different values of
+num_ctx, num_thread and num_batch. The parameters are passed as request options, so
+no model has to be recreated per configuration.
+
+All requests share the long SYSTEM prompt, which Ollama would otherwise take from its
+prompt cache after the first request. Every request therefore starts with a unique
+marker in front of the SYSTEM prompt, so the whole prompt is evaluated each time.
+
+    - num_ctx is set to the smallest candidate that fits the system prompt, a prompt
+      and num_predict tokens with some headroom (a larger context only costs memory)
+    - num_thread x num_batch are swept at that context size
+    - the configuration with the lowest estimated time per response wins
+
+The best configuration is written as a generated Modelfile variant together with a
+JSON benchmark report:
+
+    python modelfile_tuner.py model_files/democrat.mf model_files/republican.mf
+    python modelfile_tuner.py persona_construction/modelfiles/democrat_v3.3.mf --threads 4 8 --batches 256 512
+"""
+
+import argparse
+import json
+import os
+import secrets
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import ollama
+
+from modelfile import parse_modelfile, set_parameters
+
+TUNED_DIR = Path(__file__).resolve().parent / "model_files" / "tuned"
+
+# a few evaluation prompts, cycled through by the measurements
+BENCHMARK_PROMPTS = [
+    "What are your thoughts on universal healthcare?",
+    "How should the government handle border security?",
+    "Should the federal minimum wage be raised?",
+    "What is your position on universal background checks for gun purchases?",
+    "How should the United States respond to climate change?",
+    "Should college tuition at public universities be free?",
+    "What is the right approach to reducing violent crime?",
+    "Should voter ID be required in federal elections?",
+]
+
+CTX_CANDIDATES = [2048, 4096, 8192, 16384]
+
+BATCH_CANDIDATES = [128, 256, 512]
+
+# tokens generated per measurement
+BENCHMARK_PREDICT = 128
+
+# headroom on top of the measured prompt + num_predict tokens when choosing num_ctx
+CTX_HEADROOM = 1.25
+
+
+def thread_candidates() -> List[int]:
+    """Thread counts around the number of cores (Ollama defaults to the physical cores)."""
+    cores = os.cpu_count() or 4
+    return sorted({max(1, cores // 4), max(1, cores // 2), max(1, 3 * cores // 4), cores})
+
+
+class ModelfileTuner:
+    """Benchmarks runtime parameters of one Modelfile on one Ollama server."""
+
+    def __init__(self, modelfile_path: str, host: Optional[str] = None, repeats: int = 2):
+        """
+        Initialize the tuner.
+
+        Args:
+            modelfile_path: Modelfile to tune
+            host: Ollama server to benchmark on, defaults to OLLAMA_HOST
+            repeats: Measurements per configuration (the median is used)
+        """
+        self.modelfile_path = Path(modelfile_path)
+        self.config = parse_modelfile(self.modelfile_path)
+        self.client = ollama.Client(host)
+        self.repeats = repeats
+        self.model_name = f"tune-{self.modelfile_path.stem.replace('_', '-').replace('.', '-')}"
+        self.num_predict = int(self.config['parameters'].get('num_predict', 300))
+        self._run_id = secrets.token_hex(4)
+        self._request_index = 0
+
+    def _generate(self, options: Dict):
+        """One request whose prompt shares no prefix with earlier ones (no prompt cache hits)."""
+        prompt = BENCHMARK_PROMPTS[self._request_index % len(BENCHMARK_PROMPTS)]
+        system = f"[session {self._run_id}-{self._request_index}]\n{self.config.get('system', '')}"
+        self._request_index += 1
+        return self.client.generate(model=self.model_name, prompt=prompt, system=system, options=options)
+
+    def create_model(self):
+        print(f"Creating temporary model '{self.model_name}' from {self.modelfile_path}...")
+        self.client.create(
+            model=self.model_name,
+            from_=self.config.get('from_'),
+            system=self.config.get('system'),
+            parameters=self.config.get('parameters') or None
+        )
+
+    def delete_model(self):
+        try:
+            self.client.delete(self.model_name)
+        except Exception as e:
+            print(f"Could not delete temporary model '{self.model_name}': {e}")
+
+    def resident_memory(self) -> Optional[int]:
+        """Bytes used by the loaded tuning model."""
+        for entry in self.client.ps().models:
+            if entry.model.split(':')[0] == self.model_name:
+                return entry.size
+        return None
+
+    def measure(self, options: Dict) -> Dict:
+        """Median prompt-eval and decode speed of one configuration."""
+        options = {**options, 'num_predict': BENCHMARK_PREDICT}
+
+        # warm-up: loads the model with these options, only its token count is used
+        warm_up = self._generate(options)
+
+        prompt_speeds, decode_speeds, prompt_tokens = [], [], [warm_up.prompt_eval_count or 0]
+        for _ in range(self.repeats):
+            response = self._generate(options)
+            if response.prompt_eval_duration:
+                prompt_speeds.append(response.prompt_eval_count / response.prompt_eval_duration * 1e9)
+            if response.eval_duration:
+                decode_speeds.append(response.eval_count / response.eval_duration * 1e9)
+            prompt_tokens.append(response.prompt_eval_count or 0)
+
+        return {
+            'options': {k: v for k, v in options.items() if k != 'num_predict'},
+            'prompt_tokens_per_s': statistics.median(prompt_speeds) if prompt_speeds else None,
+            'decode_tokens_per_s': statistics.median(decode_speeds) if decode_speeds else None,
+            'prompt_tokens': max(prompt_tokens),
+            'resident_bytes': self.resident_memory(),
+        }
+
+    def estimated_seconds(self, result: Dict, prompt_tokens: int) -> float:
+        """Estimated time for one typical response (prompt processing + num_predict tokens)."""
+        if not result['prompt_tokens_per_s'] or not result['decode_tokens_per_s']:
+            return float('inf')
+        return prompt_tokens / result['prompt_tokens_per_s'] + self.num_predict / result['decode_tokens_per_s']
+
+    def choose_num_ctx(self, prompt_tokens: int, candidates: List[int]) -> int:
+        needed = (prompt_tokens + self.num_predict) * CTX_HEADROOM
+        fitting = [ctx for ctx in sorted(candidates) if ctx >= needed]
+        return fitting[0] if fitting else max(candidates)
+
+    def tune(self, threads: List[int], batches: List[int], contexts: List[int]) -> Dict:
+        """Run the sweep and return the benchmark report."""
+        self.create_model()
+        try:
+            # 1. size the context with the default settings, from the full (uncached) prompt
+            probe = self.measure({'num_ctx': max(contexts)})
+            num_ctx = self.choose_num_ctx(probe['prompt_tokens'], contexts)
+            print(f"  prompt uses {probe['prompt_tokens']} tokens, num_predict {self.num_predict} -> num_ctx {num_ctx}")
+
+            # 2. sweep threads x batch size at that context size
+            results = []
+            for num_thread in threads:
+                for num_batch in batches:
+                    result = self.measure({'num_ctx': num_ctx, 'num_thread': num_thread, 'num_batch': num_batch})
+                    result['estimated_seconds'] = self.estimated_seconds(result, probe['prompt_tokens'])
+                    results.append(result)
+                    print(f"  threads {num_thread:>3} batch {num_batch:>4}: "
+                          f"prompt {result['prompt_tokens_per_s'] or 0:7.1f} tok/s, "
+                          f"decode {result['decode_tokens_per_s'] or 0:6.1f} tok/s, "
+                          f"~{result['estimated_seconds']:.1f}s per response")
+        finally:
+            self.delete_model()
+
+        best = min(results, key=lambda r: r['estimated_seconds'])
+        return {
+            'modelfile': str(self.modelfile_path),
+            'base_model': self.config.get('from_'),
+            'cpu_count': os.cpu_count(),
+            'num_predict': self.num_predict,
+            'probe': probe,
+            'results': results,
+            'best': best,
+        }
+
+    def write_variant(self, report: Dict, output_dir: Path) -> Path:
+        """Write the Modelfile with the best parameters and the benchmark report."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        content = self.modelfile_path.read_text(encoding='utf-8')
+        tuned = set_parameters(content, report['best']['options'])
+
+        variant_path = output_dir / f"{self.modelfile_path.stem}.tuned.mf"
+        variant_path.write_text(tuned, encoding='utf-8')
+        report_path = output_dir / f"{self.modelfile_path.stem}.tuning.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        print(f"✓ Tuned Modelfile saved to {variant_path}")
+        print(f"✓ Benchmark report saved to {report_path}")
+        return variant_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune num_ctx, num_thread and num_batch of Modelfiles for CPU throughput.")
+    parser.add_argument("modelfiles", nargs="+", help="Modelfiles to tune")
+    parser.add_argument("--host", help="Ollama server to benchmark on (defaults to OLLAMA_HOST)")
+    parser.add_argument("--threads", type=int, nargs="+", default=thread_candidates(), help="num_thread candidates")
+    parser.add_argument("--batches", type=int, nargs="+", default=BATCH_CANDIDATES, help="num_batch candidates")
+    parser.add_argument("--contexts", type=int, nargs="+", default=CTX_CANDIDATES, help="num_ctx candidates")
+    parser.add_argument("--repeats", type=int, default=2, help="measurements per configuration")
+    parser.add_argument("--output-dir", default=str(TUNED_DIR), help="where the tuned Modelfiles are written")
+    args = parser.parse_args()
+
+    for modelfile_path in args.modelfiles:
+        print(f"\nTuning {modelfile_path}")
+        tuner = ModelfileTuner(modelfile_path, host=args.host, repeats=args.repeats)
+        report = tuner.tune(args.threads, args.batches, args.contexts)
+        best = report['best']
+        print(f"  best: {best['options']} (~{best['estimated_seconds']:.1f}s per response)")
+        tuner.write_variant(report, Path(args.output_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Record/replay layer ("cassette") for Ollama chat calls.
+
+Every non-streaming chat request is keyed on the model digest, the messages and the
+options. Responses are stored in a compact, content-addressed local cache so that the
+evaluation and fact-check harnesses can be re-run without waiting for the models again.
+
+The mode is selected with the OLLAMA_CASSETTE environment variable:
+    off     - always call the model, nothing is stored (default)
+    record  - always call the model and store the response
+    replay  - only use stored responses, a missing response raises CassetteMiss
+    auto    - use a stored response if there is one, otherwise call the model and store it
+
+The cache lives in OLLAMA_CASSETTE_DIR (default: .ollama_cassette in the project root):
+    models.json          model name -> digest at recording time (used in replay mode)
+    requests/ab/<key>    request key -> hash of the stored response
+    blobs/cd/<hash>      zlib-compressed JSON response (identical responses are stored once)
+"""
+
+import hashlib
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import ollama
+
+from ollama_router import _full_model_name, get_router
+
+MODES = ("off", "record", "replay", "auto")
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".ollama_cassette"
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request has not been recorded."""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _canonical(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Cassette:
+    """Caches Ollama chat responses on disk."""
+
+    def __init__(self, mode: Optional[str] = None, cache_dir: Optional[str] = None, client=None):
+        """
+        Initialize the cassette.
+
+        Args:
+            mode: One of MODES, defaults to the OLLAMA_CASSETTE environment variable
+            cache_dir: Cache directory, defaults to OLLAMA_CASSETTE_DIR or DEFAULT_CACHE_DIR
+            client: Ollama client used for live calls, defaults to the shared router (ollama_router.py)
+        """
+        mode = (mode or os.environ.get("OLLAMA_CASSETTE", "off")).lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {MODES}")
+
+        self.mode = mode
+        self.cache_dir = Path(cache_dir or os.environ.get("OLLAMA_CASSETTE_DIR") or DEFAULT_CACHE_DIR)
+        self.client = client or get_router().client()
+        self._digests: Optional[Dict[str, str]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # ---- model digests ----
+
+    def _models_file(self) -> Path:
+        return self.cache_dir / "models.json"
+
+    def _load_recorded_digests(self) -> Dict[str, str]:
+        if self._models_file().exists():
+            with open(self._models_file(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def model_digest(self, model: str) -> str:
+        """Return the digest of a model, so that rebuilt models do not reuse old responses."""
+        name = _full_model_name(model)
+        if self._digests is None:
+            self._digests = self._load_recorded_digests()
+            if not self.replaying:
+                # in replay mode the recorded digests are used, no server is needed
+                for entry in self.client.list().models:
+                    self._digests[entry.model] = entry.digest
+
+        if name not in self._digests:
+            if self.replaying:
+                raise CassetteMiss(f"Model '{name}' has never been recorded")
+            # model is not listed locally (e.g. served remotely), fall back to its name
+            self._digests[name] = name
+        return self._digests[name]
+
+    def _remember_digest(self, model: str, digest: str):
+        recorded = self._load_recorded_digests()
+        name = _full_model_name(model)
+        if recorded.get(name) != digest:
+            recorded[name] = digest
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._models_file(), "w", encoding="utf-8") as f:
+                json.dump(recorded, f, indent=2, sort_keys=True)
+
+    # ---- storage ----
+
+    def request_key(self, model: str, messages: List[Dict], options: Optional[Dict] = None, **kwargs) -> str:
+        """Hash of everything that determines a response."""
+        return _sha256(_canonical({
+            "digest": self.model_digest(model),
+            "messages": messages,
+            "options": options or {},
+            **{k: v for k, v in kwargs.items() if v is not None},
+        }))
+
+    def _request_path(self, key: str) -> Path:
+        return self.cache_dir / "requests" / key[:2] / key
+
+    def _blob_path(self, blob_hash: str) -> Path:
+        return self.cache_dir / "blobs" / blob_hash[:2] / blob_hash
+
+    def load(self, key: str) -> Optional[Dict]:
+        request_path = self._request_path(key)
+        if not request_path.exists():
+            return None
+        blob_hash = request_path.read_text(encoding="utf-8").strip()
+        with open(self._blob_path(blob_hash), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def store(self, key: str, record: Dict):
+        data = _canonical(record)
+        blob_hash = _sha256(data)
+        blob_path = self._blob_path(blob_hash)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            blob_path.write_bytes(zlib.compress(data, 9))
+        request_path = self._request_path(key)
+        request_path.parent.mkdir(parents=True, exist_ok=True)
+        request_path.write_text(blob_hash, encoding="utf-8")
+
+    # ---- chat ----
+
+    def timed_chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None, **kwargs) -> Tuple[ollama.ChatResponse, float]:
+        """
+        Chat with a model through the cassette.
+
+        Returns:
+            Tuple of (response, elapsed seconds). For replayed responses the elapsed time
+            is the one measured when the response was recorded.
+        """
+        if self.mode == "off":
+            start_time = time.time()
+            response = self.client.chat(model=model, messages=messages, options=options, **kwargs)
+            return response, time.time() - start_time
+
+        key = self.request_key(model, messages, options, **kwargs)
+
+        if self.mode in ("replay", "auto"):
+            record = self.load(key)
+            if record is not None:
+                self.hits += 1
+                return ollama.ChatResponse.model_validate(record["response"]), record["elapsed"]
+            if self.replaying:
+                raise CassetteMiss(f"No recorded response for model '{model}' (key {key[:12]})")
+
+        self.misses += 1
+        start_time = time.time()
+        response = self.client.chat(model=model, messages=messages, options=options, **kwargs)
+        elapsed = time.time() - start_time
+
+        self.store(key, {"response": response.model_dump(mode="json"), "elapsed": elapsed})
+        self._remember_digest(model, self.model_digest(model))
+        return response, elapsed
+
+    def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None, **kwargs) -> ollama.ChatResponse:
+        """Drop-in replacement for ollama.chat (non-streaming only)."""
+        return self.timed_chat(model, messages, options, **kwargs)[0]
+
+
+_default_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Cassette:
+    """Shared cassette configured from the environment."""
+    global _default_cassette
+    if _default_cassette is None:
+        _default_cassette = Cassette()
+    return _default_cassette
+
+
+def chat(model: str, messages: List[Dict], options: Optional[Dict] = None, **kwargs) -> ollama.ChatResponse:
+    return get_cassette().chat(model, messages, options, **kwargs)
+
+
+def timed_chat(model: str, messages: List[Dict], options: Optional[Dict] = None, **kwargs) -> Tuple[ollama.ChatResponse, float]:
+    return get_cassette().timed_chat(model, messages, options, **kwargs)
@@ -0,0 +1,339 @@
+"""
+Routes Ollama requests for each model to a pool of Ollama endpoints.
+
+Placement: among the healthy endpoints serving a model, endpoints that already have
+the model loaded (residency, from /api/ps) are preferred, ties are broken by the
+least number of outstanding requests. Endpoints are health checked periodically in a
+background thread. A request that fails because an endpoint is unreachable or
+overloaded is retried on the next endpoint, so a session continues on another machine
+(every request carries the full transcript). Each endpoint keeps one ollama.Client and
+one ollama.AsyncClient, so HTTP connections are pooled per endpoint.
+
+Backends are configured in a JSON file (OLLAMA_BACKENDS, default: ollama_backends.json
+in the project root):
+
+    {
+        "default": ["http://localhost:11434"],
+        "models": {
+            "dem-model:latest": ["http://node-a:11434", "http://node-b:11434"],
+            "rep-model:latest": ["http://node-b:11434", "http://node-c:11434"]
+        }
+    }
+
+Without a configuration file every model is served by OLLAMA_HOST (the ollama default).
+
+Usage:
+    router = get_router()
+    router.client().chat(model=..., messages=...)                  # like ollama.Client
+    await router.async_client().chat(model=..., messages=...)      # like ollama.AsyncClient
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import ollama
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent / "ollama_backends.json"
+
+# seconds between two health checks of the same endpoint
+HEALTH_CHECK_INTERVAL = 15.0
+
+# connections kept open per endpoint
+POOL_SIZE = 8
+
+# a hung endpoint fails over after these timeouts (a long generation only needs the
+# server to keep sending, the read timeout is per chunk)
+REQUEST_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+
+# health checks use their own client, so a hung endpoint is marked unhealthy quickly
+HEALTH_CHECK_TIMEOUT = 2.0
+
+
+class NoHealthyEndpoint(ConnectionError):
+    """Raised when no endpoint of a model's pool can serve a request."""
+
+
+def _full_model_name(model: str) -> str:
+    # ollama lists models with an explicit tag
+    return model if ":" in model.rsplit("/", 1)[-1] else f"{model}:latest"
+
+
+def _is_failover_error(error: Exception) -> bool:
+    # unreachable endpoints and server side errors are retried elsewhere, client errors are not
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return True
+    return isinstance(error, ollama.ResponseError) and error.status_code >= 500
+
+
+class Endpoint:
+    """One Ollama server with pooled sync and async clients."""
+
+    def __init__(self, host: Optional[str], pool_size: int = POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 health_check_timeout: float = HEALTH_CHECK_TIMEOUT):
+        self.host = host
+        self._client_kwargs = {
+            "timeout": timeout,
+            "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        }
+        self.client = ollama.Client(host, **self._client_kwargs)
+        self._health_client = ollama.Client(host, timeout=health_check_timeout)
+        self._async_client = None
+        self.outstanding = 0
+        self.healthy = True
+        self.resident = set()
+        self.last_checked = 0.0
+
+    @property
+    def async_client(self) -> ollama.AsyncClient:
+        # created on first use, inside the event loop that uses it
+        if self._async_client is None:
+            self._async_client = ollama.AsyncClient(self.host, **self._client_kwargs)
+        return self._async_client
+
+    def check_health(self):
+        """Refresh health and the set of loaded models."""
+        try:
+            self.resident = {m.model for m in self._health_client.ps().models}
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+            self.resident = set()
+        self.last_checked = time.time()
+
+    def __repr__(self):
+        return f"Endpoint({self.host or 'default'}, healthy={self.healthy}, outstanding={self.outstanding})"
+
+
+class OllamaRouter:
+    """Maps models to endpoint pools and places requests on them."""
+
+    def __init__(self, backends: Optional[Dict] = None, health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 pool_size: int = POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        """
+        Initialize the router.
+
+        Args:
+            backends: {"default": [hosts], "models": {model: [hosts]}}, None uses OLLAMA_HOST for everything
+            health_check_interval: Seconds between health checks, 0 disables the background checks
+            pool_size: HTTP connections kept per endpoint
+            timeout: Request timeout passed to the ollama clients (None disables it, no failover from hung endpoints)
+        """
+        backends = backends or {}
+        self._endpoints: Dict[Optional[str], Endpoint] = {}
+
+        def pool(hosts):
+            return [self._endpoint(host, pool_size, timeout) for host in hosts]
+
+        self.default_pool = pool(backends.get("default") or [None])
+        self.model_pools = {
+            _full_model_name(model): pool(hosts)
+            for model, hosts in backends.get("models", {}).items()
+        }
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+        self._health_thread = None
+
+    @classmethod
+    def from_config(cls, path: Optional[str] = None, **kwargs) -> "OllamaRouter":
+        """Load the backends from OLLAMA_BACKENDS or ollama_backends.json, if present."""
+        path = Path(path or os.environ.get("OLLAMA_BACKENDS") or DEFAULT_CONFIG_PATH)
+        backends = None
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                backends = json.load(f)
+        return cls(backends, **kwargs)
+
+    def _endpoint(self, host, pool_size, timeout) -> Endpoint:
+        # an endpoint shared by several pools keeps a single connection pool
+        if host not in self._endpoints:
+            self._endpoints[host] = Endpoint(host, pool_size, timeout)
+        return self._endpoints[host]
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return list(self._endpoints.values())
+
+    def pool_for(self, model: str) -> List[Endpoint]:
+        return self.model_pools.get(_full_model_name(model), self.default_pool)
+
+    # ---- health checks ----
+
+    def check_health(self):
+        # endpoints are checked in parallel, a hung endpoint does not delay the others
+        threads = [threading.Thread(target=endpoint.check_health, daemon=True) for endpoint in self.endpoints]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _health_loop(self):
+        while True:
+            self.check_health()
+            time.sleep(self.health_check_interval)
+
+    def _ensure_health_checks(self):
+        # with a single endpoint there is nothing to fail over to
+        if self._health_thread or self.health_check_interval <= 0 or len(self._endpoints) < 2:
+            return
+        with self._lock:
+            if self._health_thread is None:
+                # the first check also runs in the background, requests never wait for it
+                self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+                self._health_thread.start()
+
+    # ---- placement ----
+
+    def candidates(self, model: str) -> List[Endpoint]:
+        """Endpoints of the model's pool in the order they should be tried."""
+        self._ensure_health_checks()
+        name = _full_model_name(model)
+        pool = self.pool_for(model)
+        healthy = [e for e in pool if e.healthy]
+        # unhealthy endpoints stay as a last resort, the health check may be outdated
+        ranked = sorted(healthy, key=lambda e: (name not in e.resident, e.outstanding))
+        return ranked + [e for e in pool if not e.healthy]
+
+    def _acquire(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.outstanding += 1
+
+    def _release(self, endpoint: Endpoint, model: str, keep_alive=None, error: Exception = None):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is not None and _is_failover_error(error):
+                endpoint.healthy = False
+            elif error is None:
+                endpoint.healthy = True
+                # keep_alive=0 unloads the model right after the request
+                if keep_alive == 0:
+                    endpoint.resident.discard(_full_model_name(model))
+                else:
+                    endpoint.resident.add(_full_model_name(model))
+
+    def call(self, model: str, method: str, keep_alive=None, **kwargs):
+        """Call a sync client method on the best endpoint, failing over on connection errors."""
+        last_error = None
+        for endpoint in self.candidates(model):
+            self._acquire(endpoint)
+            try:
+                result = getattr(endpoint.client, method)(model=model, keep_alive=keep_alive, **kwargs)
+            except Exception as e:
+                self._release(endpoint, model, error=e)
+                if not _is_failover_error(e):
+                    raise
+                last_error = e
+                continue
+            self._release(endpoint, model, keep_alive)
+            return result
+        raise NoHealthyEndpoint(f"No endpoint could serve '{model}': {last_error}")
+
+    async def acall(self, model: str, method: str, keep_alive=None, stream: bool = False, **kwargs):
+        """Async version of call. Streams fail over only before the first chunk."""
+        last_error = None
+        for endpoint in self.candidates(model):
+            self._acquire(endpoint)
+            try:
+                result = await getattr(endpoint.async_client, method)(
+                    model=model, keep_alive=keep_alive, stream=stream, **kwargs
+                )
+                if stream:
+                    # connection errors of a stream only surface with the first chunk
+                    first_chunk = await result.__anext__()
+            except StopAsyncIteration:
+                self._release(endpoint, model, keep_alive)
+                return self._empty_stream()
+            except Exception as e:
+                self._release(endpoint, model, error=e)
+                if not _is_failover_error(e):
+                    raise
+                last_error = e
+                continue
+
+            if not stream:
+                self._release(endpoint, model, keep_alive)
+                return result
+            return self._stream(endpoint, model, keep_alive, first_chunk, result)
+        raise NoHealthyEndpoint(f"No endpoint could serve '{model}': {last_error}")
+
+    async def _stream(self, endpoint: Endpoint, model: str, keep_alive, first_chunk, rest):
+        error = None
+        try:
+            yield first_chunk
+            async for chunk in rest:
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(endpoint, model, keep_alive, error=error)
+
+    @staticmethod
+    async def _empty_stream():
+        return
+        yield
+
+    # ---- client facades ----
+
+    def client(self) -> "RouterClient":
+        return RouterClient(self)
+
+    def async_client(self) -> "AsyncRouterClient":
+        return AsyncRouterClient(self)
+
+
+class RouterClient:
+    """Subset of the ollama.Client interface backed by a router."""
+
+    def __init__(self, router: OllamaRouter):
+        self.router = router
+
+    def chat(self, model: str, messages=None, keep_alive=None, **kwargs):
+        return self.router.call(model, "chat", keep_alive=keep_alive, messages=messages, **kwargs)
+
+    def generate(self, model: str, prompt: str = "", keep_alive=None, **kwargs):
+        return self.router.call(model, "generate", keep_alive=keep_alive, prompt=prompt, **kwargs)
+
+    def create(self, model: str, **kwargs):
+        # a model has to exist on every endpoint that may serve it
+        results = [endpoint.client.create(model=model, **kwargs) for endpoint in self.router.pool_for(model)]
+        return results[-1]
+
+    def list(self) -> ollama.ListResponse:
+        models = {}
+        for endpoint in self.router.endpoints:
+            if endpoint.healthy:
+                try:
+                    for entry in endpoint.client.list().models:
+                        models.setdefault(entry.model, entry)
+                except Exception:
+                    endpoint.healthy = False
+        return ollama.ListResponse(models=list(models.values()))
+
+
+class AsyncRouterClient:
+    """Subset of the ollama.AsyncClient interface backed by a router."""
+
+    def __init__(self, router: OllamaRouter):
+        self.router = router
+
+    async def chat(self, model: str, messages=None, stream: bool = False, keep_alive=None, **kwargs):
+        return await self.router.acall(model, "chat", keep_alive=keep_alive, stream=stream, messages=messages, **kwargs)
+
+    async def generate(self, model: str, prompt: str = "", stream: bool = False, keep_alive=None, **kwargs):
+        return await self.router.acall(model, "generate", keep_alive=keep_alive, stream=stream, prompt=prompt, **kwargs)
+
+
+_default_router: Optional[OllamaRouter] = None
+
+
+def get_router() -> OllamaRouter:
+    """Shared router configured from OLLAMA_BACKENDS / ollama_backends.json."""
+    global _default_router
+    if _default_router is None:
+        _default_router = OllamaRouter.from_config()
+    return _default_router
@@ -0,0 +1,140 @@
+import argparse
+import os
+import sys
+
+import config
+
+# the record/replay layer and the model provisioning live in the project root
+sys.path.append(os.path.dirname(config.BASE_DIR))
+
+"""
+Command line interface for the persona evaluation.
+
+    python cli.py generate --tag v3.3       generate the persona responses (needs Ollama)
+    python cli.py classify --tag v3.3       classify the responses with the POLITICS model
+    python cli.py fast --tag v3.3           stratified fast evaluation with early stopping
+    python cli.py report --tag v3.3         print the leaning distribution of a tag
+    python cli.py compare v3.2 v3.3         compare the on-message rates of several tags
+    python cli.py html                      html reports of all tags and a comparison report
+
+Heavy dependencies (ollama, torch, transformers, pandas) are only imported inside the
+subcommand that needs them, so report/compare and --help start quickly.
+See startup_benchmark.py for the startup time budget.
+"""
+
+def provision_models(tag):
+    # builds the models of a tag from its modelfiles, models that are up to date are not touched
+    from ollama_cassette import get_cassette
+    from provision_models import ensure_models
+
+    if get_cassette().replaying:
+        return
+    models = {
+        config.democrat_model(tag): config.democrat_modelfile(tag),
+        config.republican_model(tag): config.republican_modelfile(tag),
+    }
+    ensure_models({model: modelfile for model, modelfile in models.items() if modelfile})
+
+def cmd_generate(args):
+    from evaluation import generate_eval_responses
+
+    provision_models(args.tag)
+    os.makedirs(config.EVAL_FOLDER, exist_ok=True)
+    generate_eval_responses(
+        eval_prompts_path = args.prompts,
+        democrat_model = config.democrat_model(args.tag),
+        republican_model = config.republican_model(args.tag),
+        results_path = config.eval_output_path(args.tag)
+    )
+
+def cmd_classify(args):
+    from politics_evalution import run_evaluation
+
+    run_evaluation(config.eval_output_path(args.tag), config.csv_results_path(args.tag))
+
+def cmd_fast(args):
+    from fast_evaluation import run_fast_evaluation
+
+    provision_models(args.tag)
+    os.makedirs(config.EVAL_FOLDER, exist_ok=True)
+    baseline_csv = config.csv_results_path(args.baseline) if args.baseline else None
+    if baseline_csv and not os.path.exists(baseline_csv):
+        print(f"No full evaluation found for baseline {args.baseline}, running without regression check.")
+        baseline_csv = None
+
+    run_fast_evaluation(
+        eval_prompts_path = args.prompts,
+        democrat_model = config.democrat_model(args.tag),
+        republican_model = config.republican_model(args.tag),
+        output_csv = config.fast_results_path(args.tag),
+        baseline_csv = baseline_csv,
+        target_half_width = args.target_half_width,
+        seed = args.seed
+    )
+
+def cmd_report(args):
+    from leaning_summary import load_results, print_report
+
+    csv_path = config.fast_results_path(args.tag) if args.fast else config.csv_results_path(args.tag)
+    print_report(load_results(csv_path), f"POLITICS classification, model tag {args.tag}")
+
+def cmd_compare(args):
+    from leaning_summary import load_results, print_comparison
+
+    print_comparison({tag: load_results(config.csv_results_path(tag)) for tag in args.tags})
+
+def cmd_html(args):
+    from html_report import build_comparison_report, build_report, fetch_plotly
+
+    if args.fetch_plotly:
+        fetch_plotly()
+    if args.tags:
+        for tag in args.tags:
+            build_report(tag, force=args.force)
+    else:
+        build_comparison_report(force=args.force)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Evaluate the political leaning of the persona models.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="generate persona responses for the evaluation prompts")
+    generate.add_argument("--tag", default=config.DEFAULT_MODEL_TAG, help="model tag to evaluate")
+    generate.add_argument("--prompts", default=config.PROMPTS_PATH, help="evaluation prompts (json)")
+    generate.set_defaults(func=cmd_generate)
+
+    classify = subparsers.add_parser("classify", help="classify generated responses with the POLITICS model")
+    classify.add_argument("--tag", default=config.DEFAULT_MODEL_TAG, help="model tag to evaluate")
+    classify.set_defaults(func=cmd_classify)
+
+    fast = subparsers.add_parser("fast", help="stratified fast evaluation with early stopping")
+    fast.add_argument("--tag", default=config.DEFAULT_MODEL_TAG, help="model tag to evaluate")
+    fast.add_argument("--baseline", default=config.DEFAULT_BASELINE_TAG, help="fully evaluated tag to compare against")
+    fast.add_argument("--prompts", default=config.PROMPTS_PATH, help="evaluation prompts (json)")
+    fast.add_argument("--target-half-width", type=float, default=0.10, help="stop once the intervals are this tight")
+    fast.add_argument("--seed", type=int, default=0, help="seed for the prompt order")
+    fast.set_defaults(func=cmd_fast)
+
+    report = subparsers.add_parser("report", help="print the leaning distribution of an evaluated tag")
+    report.add_argument("--tag", default=config.DEFAULT_MODEL_TAG, help="model tag to report")
+    report.add_argument("--fast", action="store_true", help="report the fast evaluation results")
+    report.set_defaults(func=cmd_report)
+
+    compare = subparsers.add_parser("compare", help="compare the on-message rates of evaluated tags")
+    compare.add_argument("tags", nargs="+", help="model tags, the first one is the reference")
+    compare.set_defaults(func=cmd_compare)
+
+    html = subparsers.add_parser("html", help="build the html reports from the evaluation results")
+    html.add_argument("--tags", nargs="+", help="only build the reports of these tags (default: all tags and the comparison)")
+    html.add_argument("--fetch-plotly", action="store_true", help="download the shared plotly.js file used by all reports")
+    html.add_argument("--force", action="store_true", help="summarize the results again even if they did not change")
+    html.set_defaults(func=cmd_html)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
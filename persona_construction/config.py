@@ -0,0 +1,75 @@
+import os
+
+"""
+Shared settings of the persona evaluation.
+Every script takes the model tag as an argument, the paths below are derived from it.
+"""
+
+# the model version that is evaluated when no tag is given
+DEFAULT_MODEL_TAG   = "v3.3"
+
+# the fully evaluated version new versions are compared against (fast evaluation)
+DEFAULT_BASELINE_TAG = "v3.2"
+
+# the Ollama namespace the fine tuned models are pushed to
+MODEL_NAMESPACE     = "nadinekitzwoegerer"
+
+# paths are relative to this folder so the scripts can be started from anywhere
+BASE_DIR            = os.path.dirname(os.path.abspath(__file__))
+
+EVAL_FOLDER         = os.path.join(BASE_DIR, "eval_results")
+
+# this is the file where the evaluation prompts are stored
+PROMPTS_PATH        = os.path.join(BASE_DIR, "evaluation_prompts.json")
+
+# the versioned modelfiles, e.g. democrat_v3.3.mf
+MODELFILES_FOLDER   = os.path.join(BASE_DIR, "modelfiles")
+
+def democrat_model(model_tag):
+    return f"{MODEL_NAMESPACE}/dem-model:{model_tag}"
+
+def republican_model(model_tag):
+    return f"{MODEL_NAMESPACE}/rep-model:{model_tag}"
+
+# the modelfiles a model tag is built from (None if the tag only exists in the registry)
+def democrat_modelfile(model_tag):
+    return _versioned_modelfile("democrat", model_tag)
+
+def republican_modelfile(model_tag):
+    return _versioned_modelfile("republican", model_tag)
+
+def _versioned_modelfile(persona, model_tag):
+    # the first versions were saved as .md
+    for extension in (".mf", ".md"):
+        path = os.path.join(MODELFILES_FOLDER, f"{persona}_{model_tag}{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+# all tags with a democrat and a republican modelfile
+def available_model_tags():
+    tags = set()
+    for file_name in os.listdir(MODELFILES_FOLDER):
+        if file_name.startswith("democrat_"):
+            tags.add(os.path.splitext(file_name[len("democrat_"):])[0])
+    return sorted(tag for tag in tags if republican_modelfile(tag))
+
+# this is the file where the prompts + outputs of the finetuned models are stored
+def eval_output_path(model_tag):
+    return os.path.join(EVAL_FOLDER, f"eval_results_{model_tag}.jsonl")
+
+# this is the csv file that contains the political leaning of the models
+def csv_results_path(model_tag):
+    return os.path.join(EVAL_FOLDER, f"politico_results_{model_tag}.csv")
+
+# this is the html report of one model tag
+def html_report_path(model_tag):
+    return os.path.join(EVAL_FOLDER, f"persona_evaluation_report_{model_tag}.html")
+
+# this is the html report that compares all evaluated model tags
+def comparison_report_path():
+    return os.path.join(EVAL_FOLDER, "persona_evaluation_comparison.html")
+
+# this is the csv file that contains the political leaning of the sampled responses (fast evaluation)
+def fast_results_path(model_tag):
+    return os.path.join(EVAL_FOLDER, f"fast_results_{model_tag}.csv")
@@ -1,31 +1,28 @@
-from evaluation import *
-from politics_evalution import *
-import os
+from cli import main
+from config import DEFAULT_BASELINE_TAG, DEFAULT_MODEL_TAG
 
-# specify which model you want to evaluate
-MODEL_TAG           = "v3.3"
-
-EVAL_FOLDER         = "eval_results"
+"""
+Runs the full evaluation (generate + classify) for one model version.
+Same as `python cli.py generate --tag MODEL_TAG` followed by `python cli.py classify --tag MODEL_TAG`.
+"""
 
-# this is the file where the evaluation prompts are stored
-PROMPTS_PATH        = "evaluation_prompts.json"
+# specify which model you want to evaluate
+MODEL_TAG           = DEFAULT_MODEL_TAG
 
-# this is the file where the llm responses for the evaluation prompts are stored
-EVAL_OUTPUT_PATH    = os.path.join(EVAL_FOLDER, f"eval_results_{MODEL_TAG}.jsonl")
+# set to True to only run a stratified sample of the prompts (see fast_evaluation.py)
+FAST_EVAL           = False
 
-# this is the csv file that contains the political leaning of the models
-CSV_RESULTS_PATH    = os.path.join(EVAL_FOLDER, f'politico_results_{MODEL_TAG}.csv')
+# the fully evaluated version the fast evaluation is compared against
+BASELINE_TAG        = DEFAULT_BASELINE_TAG
 
 
 if __name__ == "__main__":
-    os.makedirs(EVAL_FOLDER, exist_ok=True)
-    print("Generating LLM responses")
-    generate_eval_responses(
-        eval_prompts_path = PROMPTS_PATH,
-        democrat_model = f"nadinekitzwoegerer/dem-model:{MODEL_TAG}",
-        republican_model = f"nadinekitzwoegerer/rep-model:{MODEL_TAG}",
-        results_path = EVAL_OUTPUT_PATH
-    )
-
-    print("Running Evaluation with POLITICO model.")
-    run_evaluation(EVAL_OUTPUT_PATH, CSV_RESULTS_PATH)
\ No newline at end of file
+    if FAST_EVAL:
+        print("Running fast evaluation on a stratified sample of the prompts.")
+        main(["fast", "--tag", MODEL_TAG, "--baseline", BASELINE_TAG])
+    else:
+        print("Generating LLM responses")
+        main(["generate", "--tag", MODEL_TAG])
+
+        print("Running Evaluation with POLITICO model.")
+        main(["classify", "--tag", MODEL_TAG])
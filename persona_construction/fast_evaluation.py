@@ -0,0 +1,253 @@
+import csv
+import math
+import os
+import random
+
+from config import DEFAULT_BASELINE_TAG, DEFAULT_MODEL_TAG, EVAL_FOLDER, PROMPTS_PATH, democrat_model, republican_model, csv_results_path, fast_results_path
+from evaluation import load_prompts, llm_response
+from leaning_summary import EXPECTED_LEANING, load_results, on_message_counts
+from politics_evalution import load_classifier
+
+"""
+Fast evaluation mode for checking a new persona version against a baseline.
+
+Instead of generating and classifying every prompt, prompts are sampled round-robin
+across their 'category' (stratified sampling). After every prompt the per-persona
+"on-message" rate (Democrat -> LABEL_0, Republican -> LABEL_2) is re-estimated with a
+stratified estimator and a confidence interval. Sampling stops as soon as
+    - every persona's interval is tighter than TARGET_HALF_WIDTH, or
+    - the interval of the difference to the baseline rate (which includes the sampling
+      variance of the baseline run) lies below -REGRESSION_MARGIN (a clear regression), or
+    - all prompts have been used (this is then the same as a full run).
+Sampling is without replacement from a finite prompt set, so a finite population
+correction is applied and the interval collapses to the point estimate once a category
+is exhausted. Per-category Wilson intervals are updated with every response as well.
+"""
+
+# z value for a 95% confidence interval
+Z_VALUE             = 1.96
+
+# stop once every persona's interval half-width is below this value
+TARGET_HALF_WIDTH   = 0.10
+
+# drop in on-message rate (compared to the baseline) that is tolerated before it counts as a regression
+REGRESSION_MARGIN   = 0.05
+
+# number of prompts per category that have to be sampled before stopping is allowed
+MIN_PER_CATEGORY    = 1
+
+CSV_COLUMNS = [
+    'prompt_id', 'category', 'prompt', 'persona_type',
+    'llm_response', 'predicted_leaning', 'confidence_score'
+]
+
+def stratify(prompts, seed=None):
+    # group prompts by category and shuffle each group
+    rng = random.Random(seed)
+    strata = {}
+    for item in prompts:
+        strata.setdefault(item.get('category'), []).append(item)
+    for items in strata.values():
+        rng.shuffle(items)
+    return strata
+
+def sampling_order(strata):
+    # round-robin over the categories so that every category is covered early
+    queues = [list(items) for items in strata.values()]
+    while any(queues):
+        for queue in queues:
+            if queue:
+                yield queue.pop(0)
+
+def wilson_interval(successes, n, z=Z_VALUE):
+    # Wilson score interval, well-behaved for small n and rates close to 0 or 1
+    if n == 0:
+        return 0.0, 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    centre = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return p, max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+def stratified_interval(counts, strata_sizes, z=Z_VALUE):
+    """
+    counts: {category: (successes, n)} for the sampled prompts
+    strata_sizes: {category: number of prompts in that category}
+    """
+    total = sum(strata_sizes.values())
+    estimate = 0.0
+    variance = 0.0
+    for category, size in strata_sizes.items():
+        successes, n = counts.get(category, (0, 0))
+        if n == 0:
+            # an unsampled category leaves the estimate completely open
+            return None, 0.0, 1.0, math.inf
+        weight = size / total
+        estimate += weight * successes / n
+        # adjusted rate so a category with only hits (or only misses) still has spread
+        p_adjusted = (successes + 1) / (n + 2)
+        # finite population correction: sampling without replacement
+        fpc = (size - n) / (size - 1) if size > 1 else 0.0
+        variance += weight ** 2 * p_adjusted * (1 - p_adjusted) / n * fpc
+    half_width = z * math.sqrt(variance)
+    # the half-width is returned unclipped, clipping to [0, 1] would understate it for rates close to 0 or 1
+    return estimate, max(0.0, estimate - half_width), min(1.0, estimate + half_width), half_width
+
+def load_baseline_rates(baseline_csv):
+    # on-message rate of each persona in a full evaluation run: {persona: (rate, variance)}
+    rates = {}
+    for persona, categories in on_message_counts(load_results(baseline_csv)).items():
+        hits = sum(h for h, _ in categories.values())
+        n = sum(n for _, n in categories.values())
+        if n:
+            # the baseline is a sample of responses too, its rate is not exact
+            p_adjusted = (hits + 1) / (n + 2)
+            rates[persona] = (hits / n, p_adjusted * (1 - p_adjusted) / n)
+    return rates
+
+def difference_interval(interval, baseline, z=Z_VALUE):
+    # interval of (new rate - baseline rate), the variances of both estimates add up
+    estimate, _, _, half_width = interval
+    baseline_rate, baseline_variance = baseline
+    half_width = z * math.sqrt((half_width / z) ** 2 + baseline_variance)
+    difference = estimate - baseline_rate
+    return difference, difference - half_width, difference + half_width
+
+def check_stopping(
+        intervals,
+        counts,
+        baseline_rates=None,
+        target_half_width=TARGET_HALF_WIDTH,
+        regression_margin=REGRESSION_MARGIN,
+        min_per_category=MIN_PER_CATEGORY
+):
+    # returns the reason for stopping, or None if sampling should continue
+    for persona_counts in counts.values():
+        if any(n < min_per_category for _, n in persona_counts.values()):
+            return None
+
+    if baseline_rates:
+        for persona, interval in intervals.items():
+            baseline = baseline_rates.get(persona)
+            if baseline is None or interval[0] is None:
+                continue
+            _, _, high = difference_interval(interval, baseline)
+            if high < -regression_margin:
+                return f"regression detected for {persona}"
+
+    if all(half_width <= target_half_width for _, _, _, half_width in intervals.values()):
+        return "confidence intervals are tight enough"
+
+    return None
+
+def run_fast_evaluation(
+        eval_prompts_path,
+        democrat_model,
+        republican_model,
+        output_csv,
+        baseline_csv=None,
+        target_half_width=TARGET_HALF_WIDTH,
+        regression_margin=REGRESSION_MARGIN,
+        min_per_category=MIN_PER_CATEGORY,
+        seed=0
+):
+    eval_data = load_prompts(eval_prompts_path)
+    strata = stratify(eval_data, seed=seed)
+    strata_sizes = {category: len(items) for category, items in strata.items()}
+    baseline_rates = load_baseline_rates(baseline_csv) if baseline_csv else None
+
+    models = {"Democrat": democrat_model, "Republican": republican_model}
+    classifier = load_classifier()
+
+    # {persona: {category: (successes, n)}}
+    counts = {persona: {category: (0, 0) for category in strata} for persona in models}
+    intervals = {persona: (None, 0.0, 1.0, math.inf) for persona in models}
+    # {persona: {category: (rate, low, high)}}, updated as results arrive
+    category_intervals = {persona: {} for persona in models}
+    reason = "all prompts evaluated"
+    sampled = 0
+
+    # rows are written as they arrive so an interrupted run still leaves usable results
+    with open(output_csv, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+
+        for item in sampling_order(strata):
+            category = item.get('category')
+
+            for persona, model in models.items():
+                response_text = llm_response(item['prompt'], llm_model=model)
+                prediction = classifier(response_text)[0]
+
+                writer.writerow({
+                    'prompt_id': item.get('id'),
+                    'category': category,
+                    'prompt': item['prompt'],
+                    'persona_type': persona,
+                    'llm_response': response_text,
+                    'predicted_leaning': prediction['label'],
+                    'confidence_score': prediction['score']
+                })
+
+                successes, n = counts[persona][category]
+                hit = prediction['label'] == EXPECTED_LEANING[persona]
+                counts[persona][category] = (successes + hit, n + 1)
+                category_intervals[persona][category] = wilson_interval(successes + hit, n + 1)
+                intervals[persona] = stratified_interval(counts[persona], strata_sizes)
+
+            f.flush()
+            sampled += 1
+
+            stop = check_stopping(
+                intervals,
+                counts,
+                baseline_rates=baseline_rates,
+                target_half_width=target_half_width,
+                regression_margin=regression_margin,
+                min_per_category=min_per_category
+            )
+            if stop:
+                reason = stop
+                break
+
+    print_summary(counts, intervals, category_intervals, baseline_rates, sampled, len(eval_data), reason)
+    print(f"Fast evaluation results saved to {output_csv}")
+
+    return {
+        'sampled_prompts': sampled,
+        'total_prompts': len(eval_data),
+        'stop_reason': reason,
+        'intervals': intervals,
+        'category_intervals': category_intervals,
+        'baseline_rates': baseline_rates
+    }
+
+def print_summary(counts, intervals, category_intervals, baseline_rates, sampled, total, reason):
+    print("=" * 70)
+    print(f"FAST EVALUATION: {sampled}/{total} prompts sampled ({reason})")
+    print("=" * 70)
+    for persona, (estimate, low, high, _) in intervals.items():
+        estimate_text = f"{estimate:.2f}" if estimate is not None else "n/a"
+        baseline_text = ""
+        if baseline_rates and persona in baseline_rates:
+            baseline_text = f", baseline {baseline_rates[persona][0]:.2f}"
+            if estimate is not None:
+                difference, d_low, d_high = difference_interval(intervals[persona], baseline_rates[persona])
+                baseline_text += f", difference {difference:+.2f} [{d_low:+.2f}, {d_high:+.2f}]"
+        print(f"{persona}: on-message rate {estimate_text} [{low:.2f}, {high:.2f}]{baseline_text}")
+        for category, (successes, n) in counts[persona].items():
+            if n:
+                _, c_low, c_high = category_intervals[persona][category]
+                print(f"  {category:<22} {successes}/{n}  [{c_low:.2f}, {c_high:.2f}]")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    os.makedirs(EVAL_FOLDER, exist_ok=True)
+    baseline_csv = csv_results_path(DEFAULT_BASELINE_TAG)
+    run_fast_evaluation(
+        eval_prompts_path = PROMPTS_PATH,
+        democrat_model = democrat_model(DEFAULT_MODEL_TAG),
+        republican_model = republican_model(DEFAULT_MODEL_TAG),
+        output_csv = fast_results_path(DEFAULT_MODEL_TAG),
+        baseline_csv = baseline_csv if os.path.exists(baseline_csv) else None
+    )
@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import re
+import statistics
+import urllib.request
+
+import config
+from leaning_summary import EXPECTED_LEANING, LABEL_NAMES, leaning_distribution, load_results, on_message_counts
+
+"""
+HTML reports of the persona evaluation, built from the evaluation files
+(politico_results_<tag>.csv and eval_results_<tag>.jsonl).
+
+The reports only contain pre-aggregated data (counts, quartiles, rates), not the
+responses, and all reports load the same plotly.js file from eval_results/assets
+(download it once with `python cli.py html --fetch-plotly`, otherwise the CDN is used).
+
+Each tag is summarized once into report_cache/summary_<tag>.json, keyed by the hash of
+its evaluation files, so only the results of changed tags are read again. The reports are
+rendered from these summaries and only written when their content changed, and the
+comparison report of all tags is built from the cached summaries.
+"""
+
+# same version as the reports exported from persona_evaluation.ipynb
+PLOTLY_VERSION      = "3.3.1"
+PLOTLY_CDN_URL      = f"https://cdn.plot.ly/plotly-{PLOTLY_VERSION}.min.js"
+
+# the one plotly.js file shared by all reports
+ASSETS_FOLDER       = os.path.join(config.EVAL_FOLDER, "assets")
+PLOTLY_ASSET        = os.path.join(ASSETS_FOLDER, f"plotly-{PLOTLY_VERSION}.min.js")
+
+# the summaries the reports are built from
+SUMMARY_FOLDER      = os.path.join(config.EVAL_FOLDER, "report_cache")
+
+# bump when the summary format changes, old summaries are then recomputed
+SUMMARY_VERSION     = 1
+
+LABEL_COLORS = {
+    'LABEL_0': '#1f77b4',
+    'LABEL_1': '#9467bd',
+    'LABEL_2': '#d62728'
+}
+
+PERSONA_COLORS = {"Democrat": '#1f77b4', "Republican": '#d62728'}
+
+# which response of the generation output belongs to which persona
+RESPONSE_FIELDS = {"Democrat": "dem_response", "Republican": "rep_response"}
+
+def fetch_plotly():
+    # downloads plotly.js once, all reports refer to this file
+    if not os.path.exists(PLOTLY_ASSET):
+        os.makedirs(ASSETS_FOLDER, exist_ok=True)
+        print(f"Downloading {PLOTLY_CDN_URL}...")
+        urllib.request.urlretrieve(PLOTLY_CDN_URL, PLOTLY_ASSET)
+    return PLOTLY_ASSET
+
+def plotly_src(report_path):
+    if os.path.exists(PLOTLY_ASSET):
+        return os.path.relpath(PLOTLY_ASSET, os.path.dirname(report_path)).replace(os.sep, "/")
+    return PLOTLY_CDN_URL
+
+def tag_sort_key(tag):
+    # v2 < v3.1 < v3.10
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', tag)]
+
+def evaluated_tags():
+    # all tags with a POLITICS classification
+    pattern = re.compile(r'^politico_results_(.+)\.csv$')
+    tags = [m.group(1) for m in map(pattern.match, os.listdir(config.EVAL_FOLDER)) if m]
+    return sorted(tags, key=tag_sort_key)
+
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# ---- aggregation ----
+
+def box_stats(values):
+    # what plotly needs to draw a box without the data points (Tukey fences)
+    values = sorted(values)
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"q1": value, "median": value, "q3": value, "lowerfence": value, "upperfence": value, "mean": value, "n": len(values)}
+    q1, median, q3 = statistics.quantiles(values, n=4, method='inclusive')
+    iqr = q3 - q1
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": min(v for v in values if v >= q1 - 1.5 * iqr),
+        "upperfence": max(v for v in values if v <= q3 + 1.5 * iqr),
+        "mean": statistics.fmean(values),
+        "n": len(values)
+    }
+
+def response_lengths(jsonl_path):
+    # {persona: [words per response]} of the generated responses
+    lengths = {persona: [] for persona in RESPONSE_FIELDS}
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for persona, field in RESPONSE_FIELDS.items():
+                if record.get(field):
+                    lengths[persona].append(len(record[field].split()))
+    return lengths
+
+def summarize(rows, lengths=None):
+    confidences = {}
+    topics = {}
+    for row in rows:
+        persona, label = row['persona_type'], row['predicted_leaning']
+        confidences.setdefault(persona, {}).setdefault(label, []).append(float(row['confidence_score']))
+        categories = topics.setdefault(persona, {})
+        labels = categories.setdefault(row['category'], {label: 0 for label in LABEL_NAMES})
+        labels[label] = labels.get(label, 0) + 1
+
+    return {
+        "responses": len(rows),
+        "distribution": leaning_distribution(rows),
+        "topics": topics,
+        "on_message": on_message_counts(rows),
+        "confidence": {persona: {label: box_stats(values) for label, values in labels.items()}
+                       for persona, labels in confidences.items()},
+        "lengths": {persona: box_stats(values) for persona, values in (lengths or {}).items() if values}
+    }
+
+def summary_path(tag):
+    return os.path.join(SUMMARY_FOLDER, f"summary_{tag}.json")
+
+def load_summary(tag, force=False):
+    """
+    Returns (summary, changed), the summary is only recomputed when the evaluation files of the tag changed
+    """
+    csv_path, jsonl_path = config.csv_results_path(tag), config.eval_output_path(tag)
+    sources = {"version": SUMMARY_VERSION, "csv": file_hash(csv_path), "jsonl": file_hash(jsonl_path)}
+
+    if os.path.exists(summary_path(tag)):
+        with open(summary_path(tag), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached["sources"] == sources and not force:
+            return cached, False
+
+    lengths = response_lengths(jsonl_path) if sources["jsonl"] else None
+    summary = {"tag": tag, "sources": sources, **summarize(load_results(csv_path), lengths)}
+
+    os.makedirs(SUMMARY_FOLDER, exist_ok=True)
+    with open(summary_path(tag), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary, True
+
+# ---- figures (plotly.js figure specs) ----
+
+def leaning_figure(summary):
+    distribution = summary["distribution"]
+    personas = list(distribution)
+    data = [{
+        "type": "bar",
+        "name": name,
+        "x": personas,
+        "y": [distribution[persona].get(label, 0) for persona in personas],
+        "marker": {"color": LABEL_COLORS[label]}
+    } for label, name in LABEL_NAMES.items()]
+    layout = {
+        "title": {"text": f"Political Leaning Distribution by Persona, Model Type: {summary['tag']}"},
+        "barmode": "group",
+        "xaxis": {"title": {"text": "LLM Persona"}},
+        "yaxis": {"title": {"text": "count"}},
+        "legend": {"title": {"text": "Predicted Leaning"}}
+    }
+    return data, layout
+
+def confidence_figure(summary):
+    data = []
+    for label, name in LABEL_NAMES.items():
+        personas = [p for p in summary["confidence"] if label in summary["confidence"][p]]
+        if not personas:
+            continue
+        stats = [summary["confidence"][p][label] for p in personas]
+        data.append({
+            "type": "box",
+            "name": name,
+            "x": personas,
+            "q1": [s["q1"] for s in stats],
+            "median": [s["median"] for s in stats],
+            "q3": [s["q3"] for s in stats],
+            "lowerfence": [s["lowerfence"] for s in stats],
+            "upperfence": [s["upperfence"] for s in stats],
+            "mean": [s["mean"] for s in stats],
+            "text": [f"{s['n']} responses" for s in stats],
+            "marker": {"color": LABEL_COLORS[label]}
+        })
+    layout = {
+        "title": {"text": f"Classifier Confidence by Persona, Model Type {summary['tag']}"},
+        "boxmode": "group",
+        "yaxis": {"title": {"text": "confidence_score"}},
+        "legend": {"title": {"text": "Predicted Leaning"}}
+    }
+    return data, layout
+
+def topic_figure(summary):
+    # one subplot per persona
+    personas = list(summary["topics"])
+    data = []
+    for i, persona in enumerate(personas):
+        categories = summary["topics"][persona]
+        for label, name in LABEL_NAMES.items():
+            data.append({
+                "type": "bar",
+                "name": name,
+                "legendgroup": label,
+                "showlegend": i == 0,
+                "x": list(categories),
+                "y": [categories[c].get(label, 0) for c in categories],
+                "marker": {"color": LABEL_COLORS[label]},
+                "xaxis": f"x{i + 1}" if i else "x",
+                "yaxis": f"y{i + 1}" if i else "y"
+            })
+    layout = {
+        "title": {"text": f"Leaning Breakdown by Topic, Model Type: {summary['tag']}"},
+        "barmode": "relative",
+        "grid": {"rows": 1, "columns": max(len(personas), 1), "pattern": "independent"},
+        "annotations": [{
+            "text": f"persona_type={persona}", "showarrow": False,
+            "xref": f"x{i + 1} domain" if i else "x domain", "yref": "paper",
+            "x": 0.5, "y": 1.02, "xanchor": "center", "yanchor": "bottom"
+        } for i, persona in enumerate(personas)]
+    }
+    return data, layout
+
+def length_figure(summary):
+    lengths = summary["lengths"]
+    data = [{
+        "type": "box",
+        "name": persona,
+        "x": [persona],
+        **{key: [stats[key]] for key in ("q1", "median", "q3", "lowerfence", "upperfence", "mean")},
+        "marker": {"color": PERSONA_COLORS.get(persona)}
+    } for persona, stats in lengths.items()]
+    layout = {
+        "title": {"text": f"Response Length in Words, Model Type: {summary['tag']}"},
+        "yaxis": {"title": {"text": "words"}},
+        "showlegend": False
+    }
+    return data, layout
+
+def _rate(hits_and_totals):
+    hits = sum(h for h, _ in hits_and_totals)
+    total = sum(n for _, n in hits_and_totals)
+    return hits / total if total else None
+
+def on_message_figure(summaries):
+    tags = [s["tag"] for s in summaries]
+    data = [{
+        "type": "scatter",
+        "mode": "lines+markers",
+        "name": persona,
+        "x": tags,
+        "y": [_rate(s["on_message"].get(persona, {}).values()) for s in summaries],
+        "marker": {"color": PERSONA_COLORS.get(persona)}
+    } for persona in EXPECTED_LEANING]
+    layout = {
+        "title": {"text": "On-Message Rate by Model Version"},
+        "xaxis": {"title": {"text": "Model Tag"}, "type": "category"},
+        "yaxis": {"title": {"text": "share of responses with the expected leaning"}, "range": [0, 1.05]}
+    }
+    return data, layout
+
+def category_heatmap_figure(summaries, persona):
+    tags = [s["tag"] for s in summaries]
+    categories = sorted({c for s in summaries for c in s["on_message"].get(persona, {})})
+    rates = [[_rate([s["on_message"].get(persona, {}).get(c, (0, 0))]) for s in summaries] for c in categories]
+    data = [{
+        "type": "heatmap",
+        "x": tags,
+        "y": categories,
+        "z": rates,
+        "zmin": 0,
+        "zmax": 1,
+        "colorscale": "RdYlGn",
+        "texttemplate": "%{z:.2f}",
+        "hovertemplate": "%{y}, %{x}: %{z:.2f}<extra></extra>"
+    }]
+    layout = {
+        "title": {"text": f"On-Message Rate by Topic, {persona} Persona"},
+        "xaxis": {"title": {"text": "Model Tag"}, "type": "category"}
+    }
+    return data, layout
+
+def leaning_share_figure(summaries):
+    # stacked share of each leaning, one bar per persona and tag
+    x = [[s["tag"] for s in summaries for _ in s["distribution"]],
+         [persona for s in summaries for persona in s["distribution"]]]
+    data = []
+    for label, name in LABEL_NAMES.items():
+        shares = []
+        for s in summaries:
+            for labels in s["distribution"].values():
+                total = sum(labels.values())
+                shares.append(labels.get(label, 0) / total if total else 0)
+        data.append({"type": "bar", "name": name, "x": x, "y": shares, "marker": {"color": LABEL_COLORS[label]}})
+    layout = {
+        "title": {"text": "Political Leaning Share by Model Version"},
+        "barmode": "stack",
+        "yaxis": {"title": {"text": "share of responses"}, "tickformat": ".0%"},
+        "legend": {"title": {"text": "Predicted Leaning"}}
+    }
+    return data, layout
+
+# ---- html ----
+
+def _to_json(obj):
+    # compact and safe to put inside a <script> tag
+    return json.dumps(obj, separators=(',', ':')).replace("</", "<\\/")
+
+def render_html(title, heading, figures, report_path, intro=""):
+    parts = [
+        f'<html><head><meta charset="utf-8"><title>{title}</title>',
+        f'<script charset="utf-8" src="{plotly_src(report_path)}"></script></head><body>',
+        f'<h1 style="text-align:center;">{heading}</h1>',
+        intro
+    ]
+    for i, (data, layout) in enumerate(figures):
+        parts.append(f'<div id="figure-{i}" style="height:500px;"></div>')
+        parts.append(f'<script>Plotly.newPlot("figure-{i}",{_to_json(data)},{_to_json(layout)},{{"responsive":true}});</script>')
+    parts.append('</body></html>\n')
+    return "\n".join(parts)
+
+def write_if_changed(path, content):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+def build_report(tag, force=False):
+    """
+    Builds persona_evaluation_report_<tag>.html, the file is only rewritten if its content changed
+    """
+    # rendering from the cached summary is cheap, so the report is always rendered and picks up
+    # changes of the plotly.js source and of this module, not only of the results
+    summary, _ = load_summary(tag, force)
+    report_path = config.html_report_path(tag)
+
+    figures = [leaning_figure(summary), confidence_figure(summary), topic_figure(summary)]
+    if summary["lengths"]:
+        figures.append(length_figure(summary))
+
+    changed = write_if_changed(report_path, render_html(
+        f"LLM Persona Evaluation for Model {tag}",
+        f"Political Persona Evaluation Report for Model {tag}",
+        figures,
+        report_path
+    ))
+    print(f"Report for {tag} {'saved to' if changed else 'is up to date:'} {report_path}")
+    return summary
+
+def build_comparison_report(tags=None, force=False):
+    """
+    Builds the report comparing all tags, only the summaries of changed tags are recomputed
+    """
+    tags = sorted(tags or evaluated_tags(), key=tag_sort_key)
+    summaries = [build_report(tag, force) for tag in tags]
+
+    figures = [on_message_figure(summaries), leaning_share_figure(summaries)]
+    figures += [category_heatmap_figure(summaries, persona) for persona in EXPECTED_LEANING]
+
+    responses = ", ".join(f"{s['tag']}: {s['responses']}" for s in summaries)
+    report_path = config.comparison_report_path()
+    changed = write_if_changed(report_path, render_html(
+        "LLM Persona Evaluation, Model Comparison",
+        "Political Persona Evaluation, Model Comparison",
+        figures,
+        report_path,
+        intro=f'<p style="text-align:center;">Classified responses per model tag ({responses})</p>'
+    ))
+    print(f"Comparison report {'saved to' if changed else 'is up to date:'} {report_path}")
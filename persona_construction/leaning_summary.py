@@ -0,0 +1,92 @@
+import csv
+
+"""
+Summaries of the POLITICS classification results (politico_results_*.csv).
+Only uses the standard library, so reports stay fast without pandas or torch.
+"""
+
+# map the labels for readability
+LABEL_NAMES = {
+    'LABEL_0': 'Left (Democrat)',
+    'LABEL_1': 'Center',
+    'LABEL_2': 'Right (Republican)'
+}
+
+# the label each persona should receive from the POLITICS classifier
+EXPECTED_LEANING = {"Democrat": "LABEL_0", "Republican": "LABEL_2"}
+
+def load_results(csv_path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+def leaning_distribution(rows):
+    # {persona: {label: count}}
+    distribution = {}
+    for row in rows:
+        labels = distribution.setdefault(row['persona_type'], {label: 0 for label in LABEL_NAMES})
+        labels[row['predicted_leaning']] = labels.get(row['predicted_leaning'], 0) + 1
+    return distribution
+
+def on_message_counts(rows):
+    # {persona: {category: (responses with the expected leaning, responses)}}
+    counts = {}
+    for row in rows:
+        persona = row['persona_type']
+        categories = counts.setdefault(persona, {})
+        hits, n = categories.get(row['category'], (0, 0))
+        categories[row['category']] = (hits + (row['predicted_leaning'] == EXPECTED_LEANING.get(persona)), n + 1)
+    return counts
+
+def on_message_rates(rows):
+    # overall on-message rate of each persona
+    rates = {}
+    for persona, categories in on_message_counts(rows).items():
+        hits = sum(h for h, _ in categories.values())
+        total = sum(n for _, n in categories.values())
+        rates[persona] = hits / total if total else 0.0
+    return rates
+
+def print_report(rows, title):
+    print("=" * 70)
+    print(title)
+    print("=" * 70)
+    for persona, labels in leaning_distribution(rows).items():
+        total = sum(labels.values())
+        print(f"{persona} ({total} responses)")
+        for label, count in labels.items():
+            print(f"  {LABEL_NAMES.get(label, label):<20} {count:4d}  ({count / total * 100:5.1f}%)")
+    print("-" * 70)
+    print("On-message rate by category")
+    for persona, categories in on_message_counts(rows).items():
+        print(f"{persona}")
+        for category, (hits, n) in categories.items():
+            print(f"  {category:<22} {hits}/{n}")
+    print("=" * 70)
+
+def print_comparison(results_by_tag):
+    """
+    results_by_tag: {model_tag: rows}, the first tag is the reference
+    """
+    tags = list(results_by_tag)
+    counts = {tag: on_message_counts(rows) for tag, rows in results_by_tag.items()}
+    personas = sorted({persona for tag_counts in counts.values() for persona in tag_counts})
+
+    print("=" * 70)
+    print("On-message rate: " + " vs ".join(tags))
+    print("=" * 70)
+    for persona in personas:
+        categories = sorted({c for tag in tags for c in counts[tag].get(persona, {})})
+        print(f"{persona}")
+        print(f"  {'category':<22}" + "".join(f"{tag:>10}" for tag in tags))
+        for category in ['overall'] + categories:
+            line = f"  {category:<22}"
+            for tag in tags:
+                persona_counts = counts[tag].get(persona, {})
+                if category == 'overall':
+                    hits = sum(h for h, _ in persona_counts.values())
+                    n = sum(n for _, n in persona_counts.values())
+                else:
+                    hits, n = persona_counts.get(category, (0, 0))
+                line += f"{hits / n:>10.2f}" if n else f"{'-':>10}"
+            print(line)
+    print("=" * 70)
@@ -1,9 +1,7 @@
-import pandas as pd
-import torch
 import json
-from transformers import pipeline
 from tqdm import tqdm
-import os
+
+from config import DEFAULT_MODEL_TAG, eval_output_path, csv_results_path
 
 """
 Go to model description: https://huggingface.co/matous-volf/political-leaning-politics
@@ -14,23 +12,21 @@ The model outputs 0 for the left, 1 for the center and 2 for the right leaning.
 
 POLITICO_MODEL      = "matous-volf/political-leaning-politics"
 
-MODEL_TAG           = "v2"
-
-EVAL_FOLDER         = "eval_results"
-
-EVAL_RESULTS_PATH   = os.path.join(EVAL_FOLDER, f"eval_results_{MODEL_TAG}.jsonl")
+def load_classifier():
+    # transformers (and torch) take seconds to import, so only import them when a classifier is needed
+    from transformers import pipeline
 
-CSV_RESULTS_PATH    = os.path.join(EVAL_FOLDER, f"politico_results_{MODEL_TAG}.csv")
-
-def run_evaluation(input_file, output_csv):
-    # load the classifier
     # tokenizer 'launch/POLITICS' as recommended by the model author
-    classifier = pipeline(
+    return pipeline(
         "text-classification", 
         model=POLITICO_MODEL,
         tokenizer="launch/POLITICS"
     )
 
+def run_evaluation(input_file, output_csv):
+    # load the classifier
+    classifier = load_classifier()
+
     results_for_csv = []
 
     # load the JSONL responses generated earlier
@@ -59,9 +55,10 @@ def run_evaluation(input_file, output_csv):
             })
 
     # 3. Create DataFrame and Save to CSV
+    import pandas as pd
     df = pd.DataFrame(results_for_csv)
     df.to_csv(output_csv, index=False, encoding='utf-8')
     print(f"Evaluation complete! Saved to {output_csv}")
 
 if __name__ == "__main__":
-    run_evaluation(EVAL_RESULTS_PATH, CSV_RESULTS_PATH)
\ No newline at end of file
+    run_evaluation(eval_output_path(DEFAULT_MODEL_TAG), csv_results_path(DEFAULT_MODEL_TAG))
\ No newline at end of file
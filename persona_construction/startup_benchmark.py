@@ -0,0 +1,89 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+"""
+Startup time benchmark for cli.py.
+
+Runs the lightweight subcommands in fresh interpreters and checks that
+    - the median wall time stays below the startup budget, and
+    - none of the heavy dependencies are imported (checked with python -X importtime).
+Exits with status 1 if a command is over budget or imports a heavy dependency.
+"""
+
+# startup time budget for lightweight subcommands in seconds
+STARTUP_BUDGET      = 0.5
+
+# number of runs per command, the median is compared against the budget
+REPEATS             = 5
+
+# modules that must not be imported by lightweight subcommands
+HEAVY_MODULES       = ["torch", "transformers", "pandas", "ollama", "httpx"]
+
+# lightweight subcommands (arguments to cli.py)
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["generate", "--help"],
+    ["report", "--tag", "v3.3"],
+    ["compare", "v3.2", "v3.3"],
+]
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+def time_command(args, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, CLI_PATH, *args], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings)
+
+def imported_modules(args):
+    # -X importtime writes one line per imported module to stderr
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI_PATH, *args],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".")[0])
+    return modules
+
+def _time_python(args):
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, *args], check=True)
+    return time.perf_counter() - start_time
+
+def run_benchmark(budget=STARTUP_BUDGET, repeats=REPEATS):
+    # interpreter startup without any project code, for reference
+    baseline = statistics.median(
+        _time_python(["-c", "pass"]) for _ in range(repeats)
+    )
+    print(f"Bare interpreter startup: {baseline:.3f}s, budget: {budget:.3f}s")
+    print("-" * 70)
+
+    failed = False
+    for args in LIGHT_COMMANDS:
+        median = time_command(args, repeats)
+        heavy = sorted(set(HEAVY_MODULES) & imported_modules(args))
+        ok = median <= budget and not heavy
+        failed = failed or not ok
+        status = "OK  " if ok else "FAIL"
+        heavy_text = f"  heavy imports: {', '.join(heavy)}" if heavy else ""
+        print(f"{status} cli.py {' '.join(args):<28} {median:.3f}s{heavy_text}")
+
+    print("-" * 70)
+    return not failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the startup time of the lightweight cli.py subcommands.")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="startup budget in seconds")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="runs per command")
+    args = parser.parse_args()
+
+    sys.exit(0 if run_benchmark(args.budget, args.repeats) else 1)
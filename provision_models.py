@@ -0,0 +1,205 @@
+"""
+Incremental provisioning of the Ollama models.
+
+A model is only created when its inputs changed since it was last built: the content of
+its Modelfile (FROM, SYSTEM and PARAMETERs, as sent to Ollama) and the digest of its
+base model. What was built is recorded per Ollama server in .ollama_models.json:
+
+    {
+        "http://localhost:11434": {
+            "dem-model:latest": {"modelfile_hash": ..., "base_digest": ..., "digest": ..., "modelfile": ...}
+        }
+    }
+
+A model is rebuilt when one of the hashes differs or when the server no longer lists it
+with the recorded digest (deleted or recreated by hand). Models are created on every
+endpoint that serves them (see ollama_router.py).
+
+Models:
+    dem-model, rep-model, fact-checker              model_files/*.mf
+    nadinekitzwoegerer/dem-model:<tag>, rep-model   persona_construction/modelfiles/*_<tag>.mf
+
+Usage:
+    python provision_models.py                      # the models of the front-end
+    python provision_models.py --tags v3.2 v3.3     # and the versioned persona models
+    python provision_models.py --all-tags --force   # rebuild everything
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from modelfile import parse_modelfile
+from ollama_router import OllamaRouter, _full_model_name, get_router
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+STATE_FILE = PROJECT_DIR / ".ollama_models.json"
+
+# models used by the front-end and the fact-checker evaluation
+DEFAULT_MODELS = {
+    "dem-model": PROJECT_DIR / "model_files" / "democrat.mf",
+    "rep-model": PROJECT_DIR / "model_files" / "republican.mf",
+    "fact-checker": PROJECT_DIR / "model_files" / "fact-checker.mf",
+}
+
+
+def modelfile_hash(config: Dict) -> str:
+    """Hash of what is sent to Ollama, comments and formatting of the Modelfile do not count."""
+    content = {key: config.get(key) for key in ("from_", "system", "parameters")}
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def versioned_models(tags: List[str]) -> Dict[str, Path]:
+    """Persona models of the given tags, named like in persona_construction/config.py."""
+    sys.path.append(str(PROJECT_DIR / "persona_construction"))
+    import config
+
+    models = {}
+    for tag in tags:
+        for model, modelfile in ((config.democrat_model(tag), config.democrat_modelfile(tag)),
+                                  (config.republican_model(tag), config.republican_modelfile(tag))):
+            if modelfile is None:
+                print(f"✗ No modelfile for '{model}' in {config.MODELFILES_FOLDER}")
+                continue
+            models[model] = Path(modelfile)
+    return models
+
+
+class ModelProvisioner:
+    """Creates models whose Modelfile or base model changed since they were last built."""
+
+    def __init__(self, router: Optional[OllamaRouter] = None, state_file: Union[str, Path] = STATE_FILE):
+        """
+        Initialize the provisioner.
+
+        Args:
+            router: Router that knows the endpoints of each model, defaults to the shared router
+            state_file: JSON file recording the inputs of the built models
+        """
+        self.router = router or get_router()
+        self.state_file = Path(state_file)
+        self.state = self._load_state()
+        self._listed: Dict[str, Dict[str, str]] = {}
+
+    def _load_state(self) -> Dict:
+        if self.state_file.exists():
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self):
+        # write-then-rename, an interrupted run never leaves a broken state file
+        tmp_path = self.state_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    @staticmethod
+    def _host_key(endpoint) -> str:
+        return endpoint.host or os.environ.get("OLLAMA_HOST", "default")
+
+    def _list(self, endpoint, refresh: bool = False) -> Dict[str, str]:
+        """Model name -> digest of one endpoint, listed once per run."""
+        key = self._host_key(endpoint)
+        if refresh or key not in self._listed:
+            self._listed[key] = {entry.model: entry.digest for entry in endpoint.client.list().models}
+        return self._listed[key]
+
+    def base_digest(self, endpoint, base_model: str) -> str:
+        """Digest of the base model on an endpoint, pulled if it is missing."""
+        name = _full_model_name(base_model)
+        if name not in self._list(endpoint):
+            print(f"Pulling base model '{base_model}' on {self._host_key(endpoint)}...")
+            endpoint.client.pull(base_model)
+            self._list(endpoint, refresh=True)
+        return self._list(endpoint)[name]
+
+    def ensure_model(self, model: str, modelfile_path: Union[str, Path], force: bool = False) -> bool:
+        """
+        Create a model on all its endpoints unless it is up to date.
+
+        Args:
+            model: Model name
+            modelfile_path: Modelfile the model is built from
+            force: Rebuild even if nothing changed
+
+        Returns:
+            True if the model was created on at least one endpoint
+        """
+        name = _full_model_name(model)
+        config = parse_modelfile(modelfile_path)
+        content_hash = modelfile_hash(config)
+        created = False
+
+        for endpoint in self.router.pool_for(name):
+            host = self._host_key(endpoint)
+            inputs = {
+                "modelfile_hash": content_hash,
+                "base_digest": self.base_digest(endpoint, config["from_"]),
+            }
+            record = self.state.get(host, {}).get(name)
+            up_to_date = (
+                record is not None
+                and all(record.get(key) == value for key, value in inputs.items())
+                and self._list(endpoint).get(name) == record.get("digest")
+            )
+            if up_to_date and not force:
+                print(f"✓ Model '{name}' is up to date on {host}")
+                continue
+
+            print(f"Creating model '{name}' from {modelfile_path} on {host}...")
+            endpoint.client.create(
+                model=name,
+                from_=config.get("from_"),
+                system=config.get("system"),
+                parameters=config.get("parameters") or None
+            )
+            self.state.setdefault(host, {})[name] = {
+                **inputs,
+                "digest": self._list(endpoint, refresh=True).get(name),
+                "modelfile": str(modelfile_path),
+            }
+            self._save_state()
+            created = True
+            print(f"✓ Model '{name}' created successfully")
+
+        return created
+
+    def ensure_models(self, models: Dict[str, Union[str, Path]], force: bool = False) -> List[str]:
+        """Provision several models, returns the names of the created ones."""
+        return [model for model, modelfile_path in models.items()
+                if self.ensure_model(model, modelfile_path, force=force)]
+
+
+def ensure_models(models: Dict[str, Union[str, Path]], force: bool = False) -> List[str]:
+    """Provision models with the shared router and the project state file."""
+    return ModelProvisioner().ensure_models(models, force=force)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the Ollama models whose Modelfiles or base models changed.")
+    parser.add_argument("--tags", nargs="+", default=[], help="also provision these persona model versions")
+    parser.add_argument("--all-tags", action="store_true", help="provision every version in persona_construction/modelfiles")
+    parser.add_argument("--skip-default", action="store_true", help="do not provision dem-model, rep-model and fact-checker")
+    parser.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+    args = parser.parse_args()
+
+    models = {} if args.skip_default else dict(DEFAULT_MODELS)
+    if args.all_tags:
+        sys.path.append(str(PROJECT_DIR / "persona_construction"))
+        import config
+        args.tags = config.available_model_tags()
+    models.update(versioned_models(args.tags))
+
+    created = ensure_models(models, force=args.force)
+    print(f"\n{len(created)} of {len(models)} models created, {len(models) - len(created)} up to date.")
+
+
+if __name__ == "__main__":
+    main()
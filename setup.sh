@@ -18,6 +18,5 @@ fi
 echo "Pulling and Creating Ollama models..."
 ollama pull HammerAI/mistral-nemo-uncensored:latest # Foundation model for political personas
 
-ollama create dem-model -f model_files/democrat.mf
-ollama create rep-model -f model_files/republican.mf
-ollama create fact-checker -f model_files/fact-checker.mf
\ No newline at end of file
+# Only models whose Modelfile or base model changed are (re)created
+python provision_models.py
\ No newline at end of file
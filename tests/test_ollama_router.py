@@ -0,0 +1,120 @@
+"""
+Failover tests of ollama_router.py against local stand-in servers (no Ollama needed).
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from ollama_router import OllamaRouter
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers /api/ps and non-streaming /api/chat like an Ollama server."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send({"models": []})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._send({
+            "model": request["model"],
+            "message": {"role": "assistant", "content": f"served by {self.server.server_port}"},
+            "done": True,
+        })
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def hung():
+    """Accepts connections but never answers."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    connections = []
+
+    def accept():
+        while True:
+            try:
+                connections.append(listener.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f"http://127.0.0.1:{listener.getsockname()[1]}"
+    listener.close()
+    for connection in connections:
+        connection.close()
+
+
+@pytest.fixture
+def refused():
+    """A port nothing listens on."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return f"http://127.0.0.1:{port}"
+
+
+def chat(router):
+    response = router.call("dem-model", "chat", messages=[{"role": "user", "content": "hi"}])
+    return response["message"]["content"]
+
+
+def test_refused_endpoint_fails_over(refused, stand_in):
+    router = OllamaRouter({"default": [refused, stand_in]}, health_check_interval=0)
+    assert chat(router) == f"served by {stand_in.rsplit(':', 1)[1]}"
+    assert not router.default_pool[0].healthy
+    assert router.candidates("dem-model")[0].host == stand_in
+
+
+def test_hung_endpoint_fails_over(hung, stand_in):
+    router = OllamaRouter({"default": [hung, stand_in]}, health_check_interval=0,
+                          timeout=httpx.Timeout(1.0, connect=1.0))
+    start = time.time()
+    assert chat(router) == f"served by {stand_in.rsplit(':', 1)[1]}"
+    assert time.time() - start < 5
+    assert not router.default_pool[0].healthy
+
+
+def test_health_check_is_not_blocked_by_hung_endpoint(hung, refused, stand_in):
+    router = OllamaRouter({"default": [hung, refused, stand_in]}, health_check_interval=0)
+    start = time.time()
+    router.check_health()
+    assert time.time() - start < 5
+    assert [endpoint.healthy for endpoint in router.default_pool] == [False, False, True]
+
+
+def test_first_health_check_runs_in_background(hung, stand_in):
+    router = OllamaRouter({"default": [hung, stand_in]}, health_check_interval=60)
+    start = time.time()
+    router.candidates("dem-model")
+    assert time.time() - start < 0.5